@@ -0,0 +1,87 @@
+from contextlib import asynccontextmanager
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from main import (
+    CAT_API_CONNECT_TIMEOUT,
+    CAT_API_FAILURE_THRESHOLD,
+    CAT_API_POOL_SIZE,
+    CAT_API_READ_TIMEOUT,
+    CAT_API_RESET_TIMEOUT,
+    CAT_API_URL,
+    CAT_FACT_POOL_ENABLED,
+    FALLBACK_FACT,
+    fact_pool,
+    render_profile,
+)
+from upstream import AsyncUpstreamClient
+
+
+# ASGI variant of the profile service.
+# Run with: uvicorn asgi:app --host 0.0.0.0 --port $PORT
+# The upstream call never blocks the event loop, so one process can hold
+# thousands of in-flight /me requests.
+async_cat_api_client = AsyncUpstreamClient(
+    connect_timeout=CAT_API_CONNECT_TIMEOUT,
+    read_timeout=CAT_API_READ_TIMEOUT,
+    pool_size=CAT_API_POOL_SIZE,
+    failure_threshold=CAT_API_FAILURE_THRESHOLD,
+    reset_timeout=CAT_API_RESET_TIMEOUT,
+)
+
+
+async def get_cat_fact_async():
+    """
+    Fetch a random cat fact from Cat Facts API without blocking the event loop.
+    Returns a fallback message if API fails.
+    """
+    try:
+        data = await async_cat_api_client.get_json(CAT_API_URL)
+        return data.get("fact", "No cat fact available")
+    except Exception as e:
+        # return a fall back message if any error occurrs.
+        print(f"Error fetching cat fact: {e}")
+        return FALLBACK_FACT
+
+
+async def get_profile(request):
+    """
+    Same response as the Flask /me endpoint.
+    """
+    cat_fact = fact_pool.get()
+    if cat_fact is None:
+        cat_fact = await get_cat_fact_async()
+
+    return Response(render_profile(cat_fact), status_code=200, media_type="application/json")
+
+
+async def get_health(request):
+    return JSONResponse({
+        "status": "success",
+        "cat_api": async_cat_api_client.stats(),
+        "fact_pool": {"size": len(fact_pool), "capacity": fact_pool.size},
+    }, status_code=200)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    await async_cat_api_client.start()
+    if CAT_FACT_POOL_ENABLED:
+        fact_pool.start()
+    yield
+    fact_pool.stop()
+    await async_cat_api_client.close()
+
+
+app = Starlette(
+    routes=[
+        Route("/me", get_profile),
+        Route("/health", get_health),
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=["*"])],
+    lifespan=lifespan,
+)
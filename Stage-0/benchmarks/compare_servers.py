@@ -0,0 +1,51 @@
+"""
+Side-by-side throughput comparison of the Flask (main.py) and ASGI (asgi.py) servers.
+
+Both servers are started as subprocesses pointing CAT_API_URL at a local stub with
+artificial latency, with the fact pool disabled so every /me request makes the
+upstream call. Each server is then driven with the same number of concurrent
+clients and the results are printed as JSON.
+
+Usage:
+    python benchmarks/compare_servers.py --latency-ms 50 --concurrency 200 --requests 4000
+"""
+import argparse
+import asyncio
+import json
+
+from load_test import drive, free_port, start_server
+from stub_cat_api import StubCatApi
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Flask and ASGI /me throughput")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="stub Cat Facts API latency")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=4000)
+    args = parser.parse_args()
+
+    stub = StubCatApi(port=0, latency_ms=args.latency_ms).start_in_thread()
+    results = {
+        "stub_latency_ms": args.latency_ms,
+        "concurrency": args.concurrency,
+        "servers": {},
+    }
+    try:
+        for kind in ("flask", "asgi"):
+            port = free_port()
+            process = start_server(kind, port, stub.url)
+            try:
+                results["servers"][kind] = asyncio.run(
+                    drive(f"http://127.0.0.1:{port}/me", args.concurrency, args.requests)
+                )
+            finally:
+                process.terminate()
+                process.wait(timeout=10)
+    finally:
+        stub.stop()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
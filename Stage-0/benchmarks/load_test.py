@@ -0,0 +1,183 @@
+"""
+Load-test and latency benchmark for the /me endpoint.
+
+Starts a local stub of the Cat Facts API (configurable latency, jitter and error
+rate), starts the Flask and/or ASGI server pointing CAT_API_URL at it, drives /me
+at fixed concurrency levels and writes throughput and p50/p95/p99 latency as JSON.
+
+Usage:
+    python benchmarks/load_test.py --server both --concurrency 1,10,50,100 \
+        --requests 2000 --latency-ms 50 --error-rate 0.05 --output results.json
+
+    # against an already running server (the stub is still started for reference)
+    python benchmarks/load_test.py --url http://127.0.0.1:5000/me --concurrency 10,100
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import aiohttp
+
+from stub_cat_api import StubCatApi
+
+STAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(url, timeout=15):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"Server at {url} did not become ready")
+
+
+def start_server(kind, port, cat_api_url, fact_pool=False, extra_env=None):
+    """Starts the Flask ("flask") or ASGI ("asgi") server as a subprocess."""
+    env = dict(
+        os.environ,
+        PORT=str(port),
+        CAT_API_URL=cat_api_url,
+        CAT_FACT_POOL_ENABLED="true" if fact_pool else "false",
+        CAT_API_POOL_SIZE="1000",
+    )
+    env.update(extra_env or {})
+    if kind == "flask":
+        command = [sys.executable, "main.py"]
+    else:
+        command = [sys.executable, "-m", "uvicorn", "asgi:app", "--port", str(port), "--log-level", "warning"]
+    process = subprocess.Popen(command, cwd=STAGE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    wait_until_ready(f"http://127.0.0.1:{port}/health")
+    return process
+
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, round(percent / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+async def drive(url, concurrency, total_requests):
+    """
+    Sends `total_requests` GETs to `url` from `concurrency` concurrent clients.
+    Returns throughput, error counts and latency percentiles in milliseconds.
+    """
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    latencies = []
+    errors = 0
+    fallback_facts = 0
+    remaining = total_requests
+
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=60)) as client:
+        async def worker():
+            nonlocal errors, fallback_facts, remaining
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                try:
+                    async with client.get(url) as response:
+                        body = await response.read()
+                        if response.status != 200:
+                            errors += 1
+                        elif b"Cats are amazing creatures with incredible agility." in body:
+                            fallback_facts += 1
+                except aiohttp.ClientError:
+                    errors += 1
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": total_requests,
+        "errors": errors,
+        "fallback_facts": fallback_facts,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(total_requests / elapsed, 1),
+        "latency_ms": {
+            "min": round(latencies[0], 2),
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "max": round(latencies[-1], 2),
+        },
+    }
+
+
+def run_levels(url, concurrency_levels, requests_per_level, warmup=50):
+    """Runs one drive() per concurrency level after a short warm-up."""
+    if warmup:
+        asyncio.run(drive(url, min(10, warmup), warmup))
+    return [asyncio.run(drive(url, concurrency, requests_per_level)) for concurrency in concurrency_levels]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test /me against a local Cat Facts API stub")
+    parser.add_argument("--server", choices=["flask", "asgi", "both"], default="both")
+    parser.add_argument("--url", help="drive an already running server instead of starting one")
+    parser.add_argument("--concurrency", default="1,10,50,100", help="comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per concurrency level")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="stub Cat Facts API latency")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="random extra stub latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of stub responses failing with HTTP 500")
+    parser.add_argument("--fact-pool", action="store_true", help="enable the prefetched cat fact pool")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    args = parser.parse_args()
+
+    concurrency_levels = [int(level) for level in args.concurrency.split(",")]
+    stub = StubCatApi(port=0, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate)
+    stub.start_in_thread()
+
+    results = {
+        "requests_per_level": args.requests,
+        "fact_pool": args.fact_pool,
+        "runs": {},
+    }
+    try:
+        if args.url:
+            results["runs"]["external"] = run_levels(args.url, concurrency_levels, args.requests)
+        else:
+            kinds = ["flask", "asgi"] if args.server == "both" else [args.server]
+            for kind in kinds:
+                port = free_port()
+                process = start_server(kind, port, stub.url, fact_pool=args.fact_pool)
+                try:
+                    results["runs"][kind] = run_levels(f"http://127.0.0.1:{port}/me", concurrency_levels, args.requests)
+                finally:
+                    process.terminate()
+                    process.wait(timeout=10)
+    finally:
+        results["stub"] = stub.stats()
+        stub.stop()
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
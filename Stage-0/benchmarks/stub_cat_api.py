@@ -0,0 +1,141 @@
+"""
+Local stand-in for the Cat Facts API (https://catfact.ninja/fact).
+
+Serves GET /fact with a configurable artificial latency (plus random jitter) and
+error injection, using asyncio so that thousands of concurrent connections do
+not need thousands of threads.
+
+Usage:
+    python benchmarks/stub_cat_api.py --port 8900 --latency-ms 50 --jitter-ms 10 --error-rate 0.05
+"""
+import argparse
+import asyncio
+import json
+import random
+import threading
+
+
+class StubCatApi:
+    """Minimal HTTP/1.1 keep-alive server returning a fixed cat fact."""
+
+    def __init__(self, host="127.0.0.1", port=8900, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, seed=None):
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.requests_served = 0
+        self.errors_injected = 0
+        self._server = None
+        self._loop = None
+        self._thread = None
+        self._started = threading.Event()
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/fact"
+
+    def response_for(self):
+        """Returns (status line, body) for the next request, failing `error_rate` of them."""
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.errors_injected += 1
+            return "500 Internal Server Error", json.dumps({"message": "Injected error"})
+        body = json.dumps({"fact": "Cats sleep for around 13 to 16 hours a day.", "length": 43})
+        return "200 OK", body
+
+    def delay(self):
+        """Returns the artificial latency in seconds for the next request."""
+        latency_ms = self.latency_ms
+        if self.jitter_ms:
+            latency_ms += self.random.uniform(0, self.jitter_ms)
+        return latency_ms / 1000
+
+    def stats(self):
+        return {
+            "latency_ms": self.latency_ms,
+            "jitter_ms": self.jitter_ms,
+            "error_rate": self.error_rate,
+            "requests_served": self.requests_served,
+            "errors_injected": self.errors_injected,
+        }
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                # drain headers
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+
+                delay = self.delay()
+                if delay:
+                    await asyncio.sleep(delay)
+
+                status, body = self.response_for()
+                self.requests_served += 1
+                payload = body.encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: keep-alive\r\n\r\n".encode("ascii") + payload
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, backlog=4096)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._started.set()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def start_in_thread(self):
+        """Starts the stub on a background thread and returns once it is listening."""
+        def run():
+            self._loop = asyncio.new_event_loop()
+            try:
+                self._loop.run_until_complete(self.serve())
+            except asyncio.CancelledError:
+                pass
+            finally:
+                self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="stub-cat-api", daemon=True)
+        self._thread.start()
+        self._started.wait(timeout=5)
+        return self
+
+    def stop(self):
+        if self._loop is not None and self._server is not None:
+            self._loop.call_soon_threadsafe(self._server.close)
+            for task in asyncio.all_tasks(self._loop):
+                self._loop.call_soon_threadsafe(task.cancel)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Cat Facts API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="artificial latency added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="random extra latency between 0 and this value")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of responses that fail with HTTP 500")
+    args = parser.parse_args()
+
+    stub = StubCatApi(args.host, args.port, args.latency_ms, args.jitter_ms, args.error_rate)
+    print(f"Stub Cat Facts API listening on {stub.url}")
+    asyncio.run(stub.serve())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import threading
+import time
+from collections import deque
+
+
+class CatFactPool:
+    """
+    Bounded in-process pool of prefetched cat facts.
+    A background worker keeps the pool topped up and drops facts older than the TTL,
+    so requests can draw a fact without waiting on the upstream API.
+    """
+
+    def __init__(self, fetch_fact, size=20, ttl=300, refresh_interval=5):
+        self.fetch_fact = fetch_fact
+        self.size = size
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self._facts = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._worker = None
+
+    def __len__(self):
+        return len(self._facts)
+
+    def get(self):
+        """
+        Returns a fact from the pool in O(1), or None if the pool is empty.
+        Facts are rotated so consecutive requests get different facts.
+        """
+        now = time.monotonic()
+        with self._lock:
+            while self._facts:
+                fact, fetched_at = self._facts.popleft()
+                if now - fetched_at < self.ttl:
+                    self._facts.append((fact, fetched_at))
+                    return fact
+        return None
+
+    def add(self, fact):
+        """Adds a freshly fetched fact, evicting the oldest one if the pool is full."""
+        with self._lock:
+            self._facts.append((fact, time.monotonic()))
+
+    def refill(self):
+        """
+        Drops expired facts and fetches new ones until the pool is full.
+        Stops early on the first upstream error and tries again on the next refresh.
+        """
+        now = time.monotonic()
+        with self._lock:
+            fresh = [(fact, fetched_at) for fact, fetched_at in self._facts if now - fetched_at < self.ttl]
+            self._facts.clear()
+            self._facts.extend(fresh)
+
+        while len(self._facts) < self.size and not self._stop.is_set():
+            try:
+                fact = self.fetch_fact()
+            except Exception as e:
+                print(f"Error refilling cat fact pool: {e}")
+                break
+            self.add(fact)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refill()
+            self._stop.wait(self.refresh_interval)
+
+    def start(self):
+        """Starts the background refill worker (no-op if already running)."""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        self._stop.clear()
+        self._worker = threading.Thread(target=self._run, name="cat-fact-pool", daemon=True)
+        self._worker.start()
+
+    def stop(self):
+        """Stops the background refill worker."""
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join(timeout=self.refresh_interval)
+            self._worker = None
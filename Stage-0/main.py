@@ -1,9 +1,17 @@
-import requests
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify
 from flask_cors import CORS
 from datetime import datetime, timezone
+import json
 import os
+import time
 from dotenv import load_dotenv
+from fact_pool import CatFactPool
+from upstream import UpstreamClient
+
+try:
+    import orjson
+except ImportError: # fall back to the standard library encoder
+    orjson = None
 
 load_dotenv()
 
@@ -12,10 +20,44 @@ CORS(app)
 
     
 #Configuration
-CAT_API_URL = "https://catfact.ninja/fact"
+CAT_API_URL = os.getenv("CAT_API_URL", "https://catfact.ninja/fact")
 USER_EMAIL = os.getenv("USER_EMAIL", "your.email@example.com")
 USER_NAME = os.getenv("USER_NAME", "Your Name")
 USER_STACK = os.getenv("USER_STACK", "Python/Flask")
+FALLBACK_FACT = "Cats are amazing creatures with incredible agility."
+
+# Prefetched fact pool settings
+CAT_FACT_POOL_ENABLED = os.getenv("CAT_FACT_POOL_ENABLED", "true").lower() == "true"
+CAT_FACT_POOL_SIZE = int(os.getenv("CAT_FACT_POOL_SIZE", 20))
+CAT_FACT_TTL = float(os.getenv("CAT_FACT_TTL", 300))
+CAT_FACT_REFRESH_INTERVAL = float(os.getenv("CAT_FACT_REFRESH_INTERVAL", 5))
+
+# Cat Facts API client settings
+CAT_API_CONNECT_TIMEOUT = float(os.getenv("CAT_API_CONNECT_TIMEOUT", 3.05))
+CAT_API_READ_TIMEOUT = float(os.getenv("CAT_API_READ_TIMEOUT", 5))
+CAT_API_POOL_SIZE = int(os.getenv("CAT_API_POOL_SIZE", 10))
+CAT_API_FAILURE_THRESHOLD = int(os.getenv("CAT_API_FAILURE_THRESHOLD", 5))
+CAT_API_RESET_TIMEOUT = float(os.getenv("CAT_API_RESET_TIMEOUT", 30))
+
+
+# Keep-alive connections are reused across requests, and once the breaker trips
+# calls return the fallback immediately instead of waiting for the timeout.
+cat_api_client = UpstreamClient(
+    connect_timeout=CAT_API_CONNECT_TIMEOUT,
+    read_timeout=CAT_API_READ_TIMEOUT,
+    pool_size=CAT_API_POOL_SIZE,
+    failure_threshold=CAT_API_FAILURE_THRESHOLD,
+    reset_timeout=CAT_API_RESET_TIMEOUT,
+)
+
+
+def fetch_cat_fact():
+    """
+    Fetch a random cat fact from Cat Facts API.
+    Raises an exception if the API fails.
+    """
+    data = cat_api_client.get_json(CAT_API_URL)
+    return data.get("fact", "No cat fact available")
 
 
 def get_cat_fact():
@@ -24,40 +66,112 @@ def get_cat_fact():
     Returns a fallback message if API fails.
     """
     try: 
-        response = requests.get(CAT_API_URL, timeout=5)
-        response.raise_for_status() # raise exception for bad status code
-        data = response.json()
-        return data.get("fact", "No cat fact available")
+        return fetch_cat_fact()
     except Exception as e:
         # return a fall back message if any error occurrs.
         print(f"Error fetching cat fact: {e}")
-        return "Cats are amazing creatures with incredible agility."
+        return FALLBACK_FACT
+
+
+# Facts are refilled in the background so /me does not wait on the Cat Facts API.
+# The worker is started when the server starts (see bottom of file).
+fact_pool = CatFactPool(
+    fetch_cat_fact,
+    size=CAT_FACT_POOL_SIZE,
+    ttl=CAT_FACT_TTL,
+    refresh_interval=CAT_FACT_REFRESH_INTERVAL,
+)
+
+
+def get_pooled_cat_fact():
+    """
+    Returns a prefetched cat fact from the pool.
+    Falls back to a synchronous fetch only when the pool is empty.
+    """
+    cat_fact = fact_pool.get()
+    if cat_fact is None:
+        cat_fact = get_cat_fact()
+    return cat_fact
     
 
+def dumps_json(value):
+    """
+    Serializes value to JSON bytes, using orjson when it is installed.
+    """
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+# The user block never changes for the life of the process, so it is serialized
+# once here and only the timestamp and fact are spliced in per request.
+PROFILE_PREFIX = (
+    b'{"status":"success","user":'
+    + dumps_json({"email": USER_EMAIL, "name": USER_NAME, "stack": USER_STACK})
+    + b',"timestamp":"'
+)
+
+# (unix second, "YYYY-MM-DDTHH:MM:SS") for the last formatted second
+_timestamp_cache = (None, "")
+
+
+def current_timestamp():
+    """
+    Returns the current UTC time in ISO 8601 format, e.g. 2025-10-19T06:16:21.549803Z.
+    The date/time part is formatted at most once per second.
+    """
+    global _timestamp_cache
+    now = time.time()
+    second = int(now)
+    cached_second, formatted = _timestamp_cache
+    if cached_second != second:
+        formatted = datetime.fromtimestamp(second, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+        _timestamp_cache = (second, formatted)
+
+    return f"{formatted}.{int((now - second) * 1_000_000):06d}Z"
+
+
+def render_profile(cat_fact):
+    """
+    Returns the /me response body as JSON bytes for the given cat fact.
+    Shared by the Flask app and the ASGI app (asgi.py).
+    """
+    return b"".join((
+        PROFILE_PREFIX,
+        current_timestamp().encode("ascii"),
+        b'","fact":',
+        dumps_json(cat_fact),
+        b"}",
+    ))
+
+
 @app.route('/me')
 def get_profile():
     """
     Main endpoint that returns user profile with cat fact.
     """
     
-    current_time = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
-    cat_fact = get_cat_fact()
+    cat_fact = get_pooled_cat_fact()
 
-    response_data = {
-        "status": "success",
-        "user": {
-            "email": USER_EMAIL,
-            "name": USER_NAME,
-            "stack": USER_STACK,
-        },
-        "timestamp": current_time,
-        "fact": cat_fact,
-    }
+    return Response(render_profile(cat_fact), status=200, mimetype='application/json')
 
-    return jsonify(response_data), 200
+
+@app.route('/health')
+def get_health():
+    """
+    Returns Cat Facts API client stats (circuit breaker state, connection pool)
+    and the number of prefetched cat facts.
+    """
+    return jsonify({
+        "status": "success",
+        "cat_api": cat_api_client.stats(),
+        "fact_pool": {"size": len(fact_pool), "capacity": fact_pool.size},
+    }), 200
 
 
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 5000))
+    if CAT_FACT_POOL_ENABLED:
+        fact_pool.start()
     app.run(host='0.0.0.0', port=port, debug=False)
         
\ No newline at end of file
@@ -1,6 +1,6 @@
 import unittest
 import json 
-from unittest.mock import patch, Mock 
+from unittest.mock import patch, Mock, AsyncMock 
 import os
 import sys 
 import requests
@@ -13,7 +13,9 @@ os.environ['USER_EMAIL'] = 'test@example.com'
 os.environ['USER_NAME'] = 'Test User'
 os.environ['USER_STACK'] = 'Python/Flask'
 
-from main import app, get_cat_fact
+from main import app, get_cat_fact, fact_pool, cat_api_client, render_profile, current_timestamp
+from fact_pool import CatFactPool
+from upstream import CircuitBreaker, CircuitOpenError, UpstreamClient
 
 
 # Test the Profile API
@@ -24,12 +26,13 @@ class TestProfileAPI(unittest.TestCase):
         """set up test client and environement"""
         self.app = app.test_client()
         self.app.testing = True 
+        cat_api_client.breaker.reset()
 
     def test_get_profile_success(self):
         """Test successful profile retrieval"""
 
         #Mock cat fact API to return a known response
-        with patch('main.requests.get') as mock_get:
+        with patch('main.cat_api_client.session.get') as mock_get:
             mock_response = Mock()
             mock_response.json.return_value = {"fact": "Cats are awesome!"}
             mock_response.raise_for_status.return_value = None 
@@ -69,7 +72,7 @@ class TestProfileAPI(unittest.TestCase):
     def test_get_profile_api_failure(self):
         """Test profile retrieval when cat api fails"""
         #Mock the cat fact api to raise an exception
-        with patch('main.requests.get') as mock_get:
+        with patch('main.cat_api_client.session.get') as mock_get:
             mock_get.side_effect = Exception("API Error")
 
             response = self.app.get('/me')
@@ -91,7 +94,7 @@ class TestProfileAPI(unittest.TestCase):
         """Test profile retrieval when cat api times out"""
 
         # Mock the cat fact API to timeout
-        with patch('main.requests.get') as mock_get:
+        with patch('main.cat_api_client.session.get') as mock_get:
             mock_get.side_effect = requests.exceptions.Timeout("Request timed out")
 
             response = self.app.get('/me')
@@ -109,7 +112,7 @@ class TestProfileAPI(unittest.TestCase):
         """Test profile retrieval when cat api returns http error"""
 
         #Mock the cat fact api to return http  error
-        with patch('main.requests.get') as mock_get:
+        with patch('main.cat_api_client.session.get') as mock_get:
             mock_response = Mock()
             mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError("404 Not Found")
             mock_get.return_value = mock_response
@@ -130,9 +133,13 @@ class TestProfileAPI(unittest.TestCase):
 class TestCatFactFunction(unittest.TestCase):
     """Test cases to ensure get cat fact works correctly"""
 
+    def setUp(self):
+        """reset circuit breaker between tests"""
+        cat_api_client.breaker.reset()
+
     def test_get_cat_fact_success(self):
         """Test successful cat fact retrieval"""
-        with patch("main.requests.get") as mock_get:
+        with patch("main.cat_api_client.session.get") as mock_get:
             mock_response = Mock()
             mock_response.json.return_value = {"fact": "Cats have 32 muscles in eahc ear!"}
             mock_response.raise_for_status.return_value = None 
@@ -144,7 +151,7 @@ class TestCatFactFunction(unittest.TestCase):
 
     def test_get_cat_fact_api_error(self):
         """Test cat fact retrieval when api fails"""
-        with patch("main.requests.get") as mock_get:
+        with patch("main.cat_api_client.session.get") as mock_get:
             mock_get.side_effect = Exception("API Error")
 
             result = get_cat_fact()
@@ -153,7 +160,7 @@ class TestCatFactFunction(unittest.TestCase):
 
     def test_get_cat_fact_missing_fact_field(self):
         """Test cat fact retrieval when response doesn't have 'fact' field """
-        with patch("main.requests.get") as mock_get:
+        with patch("main.cat_api_client.session.get") as mock_get:
             mock_response = Mock()
             mock_response.json.return_value = {"message": "No fact here"}
             mock_response.raise_for_status.return_value = None
@@ -169,7 +176,7 @@ class TestTimestampFunction(unittest.TestCase):
 
     def test_timestamp_format(self):
         """Test that timestamp is in correct ISO 8601 format"""
-        with patch("main.requests.get") as mock_get:
+        with patch("main.cat_api_client.session.get") as mock_get:
             mock_response = Mock()
             mock_response.json.return_value = {"fact": "Test fact"}
             mock_response.raise_for_status.return_value = None
@@ -187,6 +194,196 @@ class TestTimestampFunction(unittest.TestCase):
             #check that timestamp ends with Z (UTC)
             self.assertTrue(timestamp.endswith('Z'))
 
+    def test_cached_timestamp_keeps_microseconds(self):
+        """Test that timestamps in the same second share the cached prefix but keep microseconds"""
+        with patch('main.time.time', side_effect=[1760854581.25, 1760854581.5]):
+            first = current_timestamp()
+            second = current_timestamp()
+
+        self.assertEqual(first, '2025-10-19T06:16:21.250000Z')
+        self.assertEqual(second, '2025-10-19T06:16:21.500000Z')
+
+
+# Test Pre-serialized Profile
+class TestRenderProfile(unittest.TestCase):
+    """Test to ensure the pre-serialized /me body is valid JSON"""
+
+    def test_render_profile(self):
+        """Test that the spliced body decodes to the expected profile"""
+        fact = 'Cats say "meow" \\ and \u00f1\n'
+        data = json.loads(render_profile(fact))
+
+        self.assertEqual(data['status'], 'success')
+        self.assertEqual(data['user'], {'email': 'test@example.com', 'name': 'Test User', 'stack': 'Python/Flask'})
+        self.assertEqual(data['fact'], fact)
+        self.assertRegex(data['timestamp'], r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d+Z')
+
+    def test_render_profile_without_orjson(self):
+        """Test that the standard library fallback produces the same JSON"""
+        fact = 'Cats say "meow"'
+        with patch('main.orjson', None):
+            data = json.loads(render_profile(fact))
+
+        self.assertEqual(data['fact'], fact)
+
+
+# Test Cat Fact Pool
+class TestCatFactPool(unittest.TestCase):
+    """Test cases to ensure the prefetched cat fact pool works correctly"""
+
+    def test_empty_pool_returns_none(self):
+        """Test that an empty pool returns None"""
+        pool = CatFactPool(Mock(), size=3)
+        self.assertIsNone(pool.get())
+
+    def test_refill_fills_pool(self):
+        """Test that refill fetches facts until the pool is full"""
+        fetch = Mock(side_effect=["Fact 1", "Fact 2", "Fact 3"])
+        pool = CatFactPool(fetch, size=3)
+        pool.refill()
+
+        self.assertEqual(len(pool), 3)
+        self.assertEqual([pool.get() for _ in range(4)], ["Fact 1", "Fact 2", "Fact 3", "Fact 1"])
+
+    def test_refill_stops_on_error(self):
+        """Test that refill stops on the first upstream error"""
+        fetch = Mock(side_effect=["Fact 1", Exception("API Error"), "Fact 3"])
+        pool = CatFactPool(fetch, size=3)
+        pool.refill()
+
+        self.assertEqual(len(pool), 1)
+        self.assertEqual(fetch.call_count, 2)
+
+    def test_expired_facts_are_dropped(self):
+        """Test that facts older than the ttl are not served"""
+        pool = CatFactPool(Mock(), size=3, ttl=0)
+        pool.add("Old fact")
+
+        self.assertIsNone(pool.get())
+        self.assertEqual(len(pool), 0)
+
+    def test_profile_uses_pooled_fact(self):
+        """Test that /me serves a pooled fact without calling the cat api"""
+        fact_pool.add("Pooled fact")
+        try:
+            with patch('main.cat_api_client.session.get') as mock_get:
+                response = app.test_client().get('/me')
+
+                data = json.loads(response.data)
+                self.assertEqual(data['fact'], 'Pooled fact')
+                mock_get.assert_not_called()
+        finally:
+            fact_pool._facts.clear()
+
+
+# Test Upstream Client
+class TestUpstreamClient(unittest.TestCase):
+    """Test cases to ensure the circuit-broken upstream client works correctly"""
+
+    def test_breaker_opens_after_threshold(self):
+        """Test that the breaker short-circuits calls after N failures"""
+        client = UpstreamClient(failure_threshold=2, reset_timeout=60)
+        with patch.object(client.session, 'get') as mock_get:
+            mock_get.side_effect = requests.exceptions.Timeout("Request timed out")
+
+            for _ in range(2):
+                with self.assertRaises(requests.exceptions.Timeout):
+                    client.get_json("http://cat.api/fact")
+
+            with self.assertRaises(CircuitOpenError):
+                client.get_json("http://cat.api/fact")
+
+            self.assertEqual(mock_get.call_count, 2)
+            self.assertEqual(client.stats()['circuit_breaker']['state'], CircuitBreaker.OPEN)
+
+    def test_half_open_probe_closes_breaker(self):
+        """Test that a successful half-open probe closes the breaker"""
+        client = UpstreamClient(failure_threshold=1, reset_timeout=0)
+        with patch.object(client.session, 'get') as mock_get:
+            mock_get.side_effect = Exception("API Error")
+            with self.assertRaises(Exception):
+                client.get_json("http://cat.api/fact")
+            self.assertEqual(client.breaker.state, CircuitBreaker.OPEN)
+
+            mock_response = Mock()
+            mock_response.json.return_value = {"fact": "Back online"}
+            mock_response.raise_for_status.return_value = None
+            mock_get.side_effect = None
+            mock_get.return_value = mock_response
+
+            self.assertEqual(client.get_json("http://cat.api/fact"), {"fact": "Back online"})
+            self.assertEqual(client.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_get_cat_fact_short_circuits_to_fallback(self):
+        """Test that get_cat_fact returns the fallback without calling the api once the breaker is open"""
+        cat_api_client.breaker.reset()
+        try:
+            with patch('main.cat_api_client.session.get') as mock_get:
+                mock_get.side_effect = Exception("API Error")
+                for _ in range(cat_api_client.breaker.failure_threshold):
+                    get_cat_fact()
+                mock_get.reset_mock()
+
+                result = get_cat_fact()
+
+                self.assertEqual(result, "Cats are amazing creatures with incredible agility.")
+                mock_get.assert_not_called()
+        finally:
+            cat_api_client.breaker.reset()
+
+    def test_health_endpoint(self):
+        """Test that breaker state and pool stats are exposed"""
+        response = app.test_client().get('/health')
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertIn('circuit_breaker', data['cat_api'])
+        self.assertIn('connection_pool', data['cat_api'])
+        self.assertIn('fact_pool', data)
+
+
+# Test ASGI App
+class TestAsgiProfileAPI(unittest.TestCase):
+    """Test cases to ensure the ASGI /me endpoint matches the Flask one"""
+
+    def setUp(self):
+        """set up ASGI test client"""
+        from starlette.testclient import TestClient
+        from asgi import app as asgi_app, async_cat_api_client
+
+        self.client = TestClient(asgi_app)
+        self.async_cat_api_client = async_cat_api_client
+
+    def test_same_json_shape_as_flask(self):
+        """Test that the ASGI response has the same shape and values as the Flask one"""
+        with patch.object(self.async_cat_api_client, 'get_json', AsyncMock(return_value={"fact": "Cats are awesome!"})), \
+             patch('main.cat_api_client.session.get') as mock_get:
+            mock_response = Mock()
+            mock_response.json.return_value = {"fact": "Cats are awesome!"}
+            mock_response.raise_for_status.return_value = None
+            mock_get.return_value = mock_response
+            cat_api_client.breaker.reset()
+
+            asgi_response = self.client.get('/me')
+            flask_response = app.test_client().get('/me')
+
+        self.assertEqual(asgi_response.status_code, 200)
+        self.assertEqual(asgi_response.headers['content-type'], 'application/json')
+        asgi_data = asgi_response.json()
+        flask_data = json.loads(flask_response.data)
+
+        self.assertEqual(asgi_data.keys(), flask_data.keys())
+        self.assertEqual(asgi_data['user'], flask_data['user'])
+        self.assertEqual(asgi_data['fact'], flask_data['fact'])
+        self.assertRegex(asgi_data['timestamp'], r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d+Z')
+
+    def test_api_failure_returns_fallback(self):
+        """Test that the ASGI endpoint returns the fallback fact when the api fails"""
+        with patch.object(self.async_cat_api_client, 'get_json', AsyncMock(side_effect=Exception("API Error"))):
+            response = self.client.get('/me')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['fact'], 'Cats are amazing creatures with incredible agility.')
 
 
 if __name__ == "__main__":
@@ -0,0 +1,201 @@
+import threading
+import time
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is short-circuited because the breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Simple circuit breaker.
+    Opens after `failure_threshold` consecutive failures, then rejects calls until
+    `reset_timeout` seconds have passed. After that a single half-open probe is let
+    through: success closes the breaker, failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Closes the breaker and clears its counters."""
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self.probe_in_flight = False
+            self.total_failures = 0
+            self.total_short_circuits = 0
+
+    def allow_request(self):
+        """Returns True if a call may go through to the upstream."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self.probe_in_flight:
+                self.probe_in_flight = True
+                return True
+            self.total_short_circuits += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self.probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            self.total_failures += 1
+            self.probe_in_flight = False
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "failure_threshold": self.failure_threshold,
+                "reset_timeout": self.reset_timeout,
+                "total_failures": self.total_failures,
+                "total_short_circuits": self.total_short_circuits,
+            }
+
+
+class UpstreamClient:
+    """
+    HTTP client for an upstream JSON API.
+    Reuses keep-alive connections from a pool and guards calls with a circuit breaker.
+    """
+
+    def __init__(self, connect_timeout=3.05, read_timeout=5, pool_size=10, failure_threshold=5, reset_timeout=30):
+        self.timeout = (connect_timeout, read_timeout)
+        self.pool_size = pool_size
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session = requests.Session()
+        self.session.mount("http://", self.adapter)
+        self.session.mount("https://", self.adapter)
+        self.total_requests = 0
+
+    def get_json(self, url):
+        """
+        GETs `url` and returns the decoded JSON body.
+        Raises CircuitOpenError without calling the upstream while the breaker is open.
+        """
+        if not self.breaker.allow_request():
+            raise CircuitOpenError(f"Circuit open for {url}")
+
+        self.total_requests += 1
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status() # raise exception for bad status code
+            data = response.json()
+        except Exception:
+            self.breaker.record_failure()
+            raise
+
+        self.breaker.record_success()
+        return data
+
+    def pool_stats(self):
+        """Returns connection counts for every host pool the client has opened."""
+        pools = []
+        for key in list(self.adapter.poolmanager.pools.keys()):
+            pool = self.adapter.poolmanager.pools.get(key)
+            if pool is None:
+                continue
+            pools.append({
+                "host": pool.host,
+                "port": pool.port,
+                "connections_opened": pool.num_connections,
+                "requests_sent": pool.num_requests,
+                "idle_connections": sum(1 for conn in list(pool.pool.queue) if conn is not None) if pool.pool is not None else 0,
+            })
+        return {"max_size": self.pool_size, "pools": pools}
+
+    def stats(self):
+        return {
+            "total_requests": self.total_requests,
+            "timeout": {"connect": self.timeout[0], "read": self.timeout[1]},
+            "circuit_breaker": self.breaker.stats(),
+            "connection_pool": self.pool_stats(),
+        }
+
+
+class AsyncUpstreamClient:
+    """
+    Non-blocking counterpart of UpstreamClient for ASGI servers.
+    Uses a shared aiohttp connection pool and the same circuit breaker logic.
+    """
+
+    def __init__(self, connect_timeout=3.05, read_timeout=5, pool_size=10, failure_threshold=5, reset_timeout=30):
+        self.timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        self.pool_size = pool_size
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.session = None
+        self.total_requests = 0
+
+    async def start(self):
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.pool_size)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def get_json(self, url):
+        """
+        GETs `url` and returns the decoded JSON body.
+        Raises CircuitOpenError without calling the upstream while the breaker is open.
+        """
+        if not self.breaker.allow_request():
+            raise CircuitOpenError(f"Circuit open for {url}")
+
+        await self.start()
+        self.total_requests += 1
+        try:
+            async with self.session.get(url) as response:
+                response.raise_for_status() # raise exception for bad status code
+                data = await response.json(content_type=None)
+        except Exception:
+            self.breaker.record_failure()
+            raise
+
+        self.breaker.record_success()
+        return data
+
+    def pool_stats(self):
+        connector = self.session.connector if self.session is not None else None
+        return {
+            "max_size": self.pool_size,
+            "idle_connections": sum(len(conns) for conns in connector._conns.values()) if connector else 0,
+            "active_connections": sum(len(conns) for conns in connector._acquired_per_host.values()) if connector else 0,
+        }
+
+    def stats(self):
+        return {
+            "total_requests": self.total_requests,
+            "timeout": {"connect": self.timeout.sock_connect, "read": self.timeout.sock_read},
+            "circuit_breaker": self.breaker.stats(),
+            "connection_pool": self.pool_stats(),
+        }
@@ -0,0 +1,38 @@
+"""
+Backfills the character index used by contains_character filters.
+
+Strings stored before the index existed have no hero_character rows and would not
+match single-character filters. This indexes every string that has none yet, in
+chunks of --chunk-size per transaction, and can be re-run or interrupted safely.
+
+Usage:
+    python backfill_characters.py --chunk-size 1000
+"""
+import argparse
+import json
+import sys
+import time
+from sqlmodel import Session
+from main import engine, create_db_and_tables
+from utilities.characters import backfill_character_index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build character index rows for stored strings")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="strings indexed per transaction")
+    args = parser.parse_args()
+
+    started = time.monotonic()
+
+    def report(indexed):
+        print(f"indexed {indexed} strings ({time.monotonic() - started:.1f}s)", file=sys.stderr)
+
+    create_db_and_tables()
+    with Session(engine) as session:
+        indexed = backfill_character_index(session, args.chunk_size, report)
+
+    print(json.dumps({"indexed": indexed}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Concurrency benchmark for the string API under mixed read/write load.
+
+Starts uvicorn for the app in --app-dir against a fresh database, seeds it with
+--seed strings through POST /strings/batch, then runs --requests operations from
+--concurrency concurrent clients:
+    70% GET /strings/{value} of a seeded string
+    10% GET /strings?min_length=..&limit=20
+    20% POST /strings with a new value
+and prints throughput and latency percentiles per DATABASE_URL as JSON.
+
+Requires aiohttp for the load generator.
+
+Usage:
+    python benchmarks/bench_concurrency.py --urls sqlite:///{db},sqlite+aiosqlite:///{db}
+    # compare with an older checkout of Stage-1:
+    python benchmarks/bench_concurrency.py --app-dir /path/to/old/Stage-1 --urls sqlite:///{db}
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from urllib.parse import quote
+
+import aiohttp
+
+STAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(url, timeout=20):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server at {url} did not become ready")
+
+
+def start_server(app_dir, database_url, port, extra_env=None):
+    env = dict(os.environ, DATABASE_URL=database_url)
+    env.update(extra_env or {})
+    command = [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"]
+    process = subprocess.Popen(command, cwd=app_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    wait_until_ready(f"http://127.0.0.1:{port}/strings?limit=1")
+    return process
+
+
+def percentile(sorted_values, percent):
+    rank = max(1, round(percent / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+async def seed(base_url, count):
+    values = [f"seeded value {i} {'x' * (i % 40)}".strip() for i in range(count)]
+    async with aiohttp.ClientSession() as client:
+        for start in range(0, count, 5000):
+            async with client.post(f"{base_url}/strings/batch", json={"values": values[start:start + 5000]}) as response:
+                await response.read()
+    return values
+
+
+async def run_mixed_load(base_url, seeded, concurrency, total_requests, rng):
+    latencies = {"read": [], "filter": [], "write": []}
+    errors = 0
+    remaining = total_requests
+    written = 0
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=120)) as client:
+        async def worker():
+            nonlocal errors, remaining, written
+            while remaining > 0:
+                remaining -= 1
+                roll = rng.random()
+                if roll < 0.7:
+                    kind, method = "read", client.get(f"{base_url}/strings/{quote(rng.choice(seeded))}")
+                elif roll < 0.8:
+                    kind, method = "filter", client.get(f"{base_url}/strings?min_length={rng.randint(1, 50)}&limit=20")
+                else:
+                    written += 1
+                    kind, method = "write", client.post(f"{base_url}/strings", json={"value": f"written {written} {rng.random()}"})
+
+                started = time.perf_counter()
+                try:
+                    async with method as response:
+                        await response.read()
+                        if response.status >= 400:
+                            errors += 1
+                except aiohttp.ClientError:
+                    errors += 1
+                latencies[kind].append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    all_latencies = sorted(latency for values in latencies.values() for latency in values)
+    return {
+        "requests": total_requests,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(total_requests / elapsed, 1),
+        "latency_ms": {
+            "p50": round(percentile(all_latencies, 50), 2),
+            "p95": round(percentile(all_latencies, 95), 2),
+            "p99": round(percentile(all_latencies, 99), 2),
+        },
+        "p50_ms_by_kind": {
+            kind: round(percentile(sorted(values), 50), 2) for kind, values in latencies.items() if values
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mixed read/write concurrency benchmark")
+    parser.add_argument("--app-dir", default=STAGE_DIR, help="Stage-1 checkout to benchmark")
+    parser.add_argument("--urls", default="sqlite:///{db},sqlite+aiosqlite:///{db}",
+                        help="comma-separated DATABASE_URLs; {db} is replaced by a fresh temporary file")
+    parser.add_argument("--seed", type=int, default=5000, help="strings stored before the run")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    results = {"app_dir": os.path.abspath(args.app_dir), "concurrency": args.concurrency, "runs": {}}
+    for url_template in args.urls.split(","):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            database_url = url_template.replace("{db}", os.path.join(temp_dir, "bench.db"))
+            port = free_port()
+            process = start_server(args.app_dir, database_url, port)
+            try:
+                base_url = f"http://127.0.0.1:{port}"
+                seeded = asyncio.run(seed(base_url, args.seed))
+                results["runs"][url_template] = asyncio.run(
+                    run_mixed_load(base_url, seeded, args.concurrency, args.requests, random.Random(0))
+                )
+            finally:
+                process.kill()
+                process.wait()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark for contains_character: LIKE '%c%' scan vs the character index.
+
+Seeds a fresh SQLite database with --rows random strings through bulk_create_strings
+(which maintains the index), then times both queries for a rare character ("7", in
+about 1% of rows) and a common one ("e", in most rows) and prints JSON.
+
+Usage:
+    python benchmarks/bench_contains.py --rows 100000 --max-length 40
+"""
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlmodel import Session, SQLModel, select  # noqa: E402
+from utilities.bulk import bulk_create_strings  # noqa: E402
+from utilities.characters import contains_character  # noqa: E402
+from utilities.database import make_engine  # noqa: E402
+from utilities.models import Hero  # noqa: E402
+
+
+def seed(session, rows, max_length, seed=0):
+    rng = random.Random(seed)
+    # letters weighted so "e" is in most strings; "7" is appended to about 1% of them
+    alphabet = "eeeeeeeetaoinshrdlu" + string.ascii_lowercase + "    "
+    for start in range(0, rows, 5000):
+        values = [
+            "".join(rng.choice(alphabet) for _ in range(rng.randint(5, max_length))) + ("7" if rng.random() < 0.01 else "")
+            for _ in range(min(5000, rows - start))
+        ]
+        bulk_create_strings(session, values)
+
+
+def measure(session, clause):
+    query = select(Hero.id).where(clause)
+    matches = len(session.exec(query).all())
+    seconds = min(timeit.repeat(lambda: session.exec(query).all(), number=5, repeat=3)) / 5
+    return {"milliseconds": round(seconds * 1000, 2), "matches": matches}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark contains_character filters")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--max-length", type=int, default=40, help="longest random string")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        engine = make_engine(f"sqlite:///{os.path.join(temp_dir, 'bench.db')}")
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            seed(session, args.rows, args.max_length)
+            results = {}
+            for char in ("7", "e"):
+                scan = measure(session, Hero.value.contains(char))
+                indexed = measure(session, contains_character(char))
+                assert scan["matches"] == indexed["matches"]
+                results[char] = {"like_scan": scan, "character_index": indexed}
+
+    print(json.dumps({"rows": args.rows, "max_length": args.max_length, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Microbenchmarks for string analysis: the six separate operations vs analyze().
+
+For every input size, times both approaches on a palindrome and a
+non-palindrome input and records peak allocated memory, then prints JSON.
+
+Usage:
+    python benchmarks/bench_operations.py --sizes 16,1000,100000,1000000,10000000
+"""
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.operations import analyze, character_frequency_map, sha256_hash, unique_characters, word_count  # noqa: E402
+
+
+def separate_passes(value):
+    """The original create_string path: six independent passes."""
+    normalized_value = value.lower()
+    return {
+        "length": len(value),
+        "is_palindrome": normalized_value == normalized_value[::-1],
+        "unique_characters": unique_characters(value),
+        "word_count": word_count(value),
+        "sha256_hash": sha256_hash(value),
+        "character_frequency_map": character_frequency_map(value),
+    }
+
+
+def single_analysis(value):
+    return analyze(value).properties()
+
+
+def make_inputs(size, seed=0):
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + "     "
+    half = "".join(rng.choice(alphabet) for _ in range(size // 2))
+    palindrome = half + half[::-1]
+    return {
+        "palindrome": palindrome,
+        "non_palindrome": "x" + palindrome[1:-1] + "y",
+    }
+
+
+def measure(func, value):
+    runs = max(1, min(2000, 2_000_000 // max(len(value), 1)))
+    seconds = min(timeit.repeat(lambda: func(value), number=runs, repeat=3)) / runs
+
+    tracemalloc.start()
+    func(value)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"microseconds": round(seconds * 1e6, 2), "peak_kib": round(peak / 1024, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark string analysis")
+    parser.add_argument("--sizes", default="16,1000,100000,1000000,10000000", help="comma-separated string sizes")
+    args = parser.parse_args()
+
+    results = []
+    for size in (int(size) for size in args.sizes.split(",")):
+        for kind, value in make_inputs(size).items():
+            assert separate_passes(value) == single_analysis(value)
+            separate = measure(separate_passes, value)
+            single = measure(single_analysis, value)
+            results.append({
+                "size": len(value),
+                "input": kind,
+                "separate_passes": separate,
+                "analyze": single,
+                "speedup": round(separate["microseconds"] / single["microseconds"], 2),
+            })
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Insert throughput and on-disk size: legacy schema (hex keys, one index per column)
+vs compact schema (binary key, composite indexes). See STRING_SCHEMA in utilities/models.py.
+
+Each schema runs in its own process (the schema is chosen at import time) against a
+fresh SQLite file. It stores --rows strings through bulk_create_strings in batches of
+--batch-size, then --single-rows more one transaction each (like POST /strings), and
+prints JSON with rows/s and the database size, split per table and index when SQLite
+was built with the dbstat table.
+
+Usage:
+    python benchmarks/bench_schema.py --rows 100000
+"""
+import argparse
+import json
+import os
+import random
+import string
+import subprocess
+import sys
+import tempfile
+import time
+
+STAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, STAGE_DIR)
+
+
+def make_values(count, seed):
+    rng = random.Random(seed)
+    alphabet = string.ascii_lowercase + "     "
+    return ["".join(rng.choice(alphabet) for _ in range(rng.randint(5, 60))) for _ in range(count)]
+
+
+def run_schema(rows, single_rows, batch_size):
+    # imported here so STRING_SCHEMA from the environment is picked up
+    from sqlalchemy import text
+    from sqlmodel import Session, SQLModel
+    from utilities.bulk import bulk_create_strings
+    from utilities.database import make_engine
+    from utilities.models import TABLES
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "bench.db")
+        engine = make_engine(f"sqlite:///{path}")
+        SQLModel.metadata.create_all(engine, tables=TABLES)
+
+        values = make_values(rows + single_rows, seed=0)
+        with Session(engine) as session:
+            started = time.perf_counter()
+            for start in range(0, rows, batch_size):
+                bulk_create_strings(session, values[start:start + batch_size])
+            bulk_seconds = time.perf_counter() - started
+
+            started = time.perf_counter()
+            for value in values[rows:]:
+                bulk_create_strings(session, [value])
+            single_seconds = time.perf_counter() - started
+
+            try:
+                objects = session.execute(text("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name ORDER BY 2 DESC")).all()
+                objects = {name: round(size / 1024 / 1024, 2) for name, size in objects}
+            except Exception:
+                objects = None  # SQLite built without dbstat
+
+        engine.dispose()
+        return {
+            "batched_rows_per_second": round(rows / bulk_seconds),
+            "single_rows_per_second": round(single_rows / single_seconds),
+            "file_mib": round(os.path.getsize(path) / 1024 / 1024, 2),
+            "mib_by_table_and_index": objects,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark legacy vs compact string schema")
+    parser.add_argument("--rows", type=int, default=100000, help="rows stored with batched inserts")
+    parser.add_argument("--single-rows", type=int, default=2000, help="rows stored one transaction each")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_schema(args.rows, args.single_rows, args.batch_size)))
+        return
+
+    results = {"rows": args.rows}
+    for schema in ("legacy", "compact"):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", "--rows", str(args.rows),
+             "--single-rows", str(args.single_rows), "--batch-size", str(args.batch_size)],
+            env=dict(os.environ, STRING_SCHEMA=schema), cwd=STAGE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout
+        results[schema] = json.loads(output)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
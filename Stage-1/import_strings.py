@@ -0,0 +1,120 @@
+"""
+Streaming NDJSON bulk import for the string store.
+
+Reads newline-delimited input one line at a time, analyzes records in fixed-size
+chunks and stores each chunk in its own transaction, so memory stays flat
+regardless of input size. Each line is either a JSON string ("level") or an
+object with a "value" field ({"value": "level"}); blank lines are skipped.
+
+Progress is reported after every committed chunk together with the line offset to
+resume from. Pass --start-line to skip lines that were already imported, or
+--state-file to record and resume from the last committed line automatically.
+
+Usage:
+    python import_strings.py strings.ndjson --chunk-size 1000
+    cat strings.ndjson | python import_strings.py - --state-file import.state
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from sqlmodel import Session
+from main import engine, create_db_and_tables
+from utilities.bulk import bulk_create_strings
+
+
+def parse_line(line: bytes):
+    """
+    Returns the value from one NDJSON line, or None if the line is not valid.
+    """
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    if isinstance(record, dict):
+        return record.get("value")
+    return record
+
+
+def import_ndjson(lines, session: Session, chunk_size: int = 1000, start_line: int = 0, on_progress=None) -> dict:
+    """
+    Imports NDJSON lines in chunks of chunk_size, one transaction per chunk.
+    Lines before start_line are skipped. on_progress(totals) is called after every
+    commit; totals["line"] is the number of lines consumed so far (the resume offset).
+    """
+    totals = {"line": start_line, "created": 0, "conflict": 0, "invalid": 0}
+    chunk = []
+
+    def flush():
+        for result in bulk_create_strings(session, chunk):
+            totals[result["status"]] += 1
+        chunk.clear()
+        if on_progress is not None:
+            on_progress(dict(totals))
+
+    for line_number, line in enumerate(lines):
+        if line_number < start_line:
+            continue
+        totals["line"] = line_number + 1
+        if not line.strip():
+            continue
+        chunk.append(parse_line(line))
+        if len(chunk) >= chunk_size:
+            flush()
+
+    if chunk:
+        flush()
+    return totals
+
+
+def read_state(path: str) -> int:
+    if path and os.path.exists(path):
+        with open(path) as f:
+            return int(f.read().strip() or 0)
+    return 0
+
+
+def write_state(path: str, line: int):
+    # write then rename so an interrupted write never leaves a corrupt offset
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as f:
+        f.write(str(line))
+    os.replace(temp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream an NDJSON file of strings into the database")
+    parser.add_argument("input", help="NDJSON file to import, or - for stdin")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="records analyzed and committed per transaction")
+    parser.add_argument("--start-line", type=int, default=None, help="skip this many lines (resume offset)")
+    parser.add_argument("--state-file", help="file used to record and resume from the last committed line")
+    args = parser.parse_args()
+
+    start_line = args.start_line if args.start_line is not None else read_state(args.state_file)
+    started = time.monotonic()
+
+    def report(totals):
+        if args.state_file:
+            write_state(args.state_file, totals["line"])
+        elapsed = time.monotonic() - started
+        print(
+            f"line {totals['line']}: created={totals['created']} conflict={totals['conflict']} "
+            f"invalid={totals['invalid']} ({elapsed:.1f}s) - resume with --start-line {totals['line']}",
+            file=sys.stderr,
+        )
+
+    create_db_and_tables()
+    stream = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+    try:
+        with Session(engine) as session:
+            totals = import_ndjson(stream, session, args.chunk_size, start_line, report)
+    finally:
+        if stream is not sys.stdin.buffer:
+            stream.close()
+
+    print(json.dumps(totals))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,25 @@
 from fastapi import Depends, FastAPI, HTTPException, status, Query
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from contextlib import asynccontextmanager
-from utilities.operations import length, is_palindrome, unique_characters, word_count, sha256_hash, character_frequency_map, get_current_time
+from fastapi.concurrency import run_in_threadpool
+import asyncio
+from utilities.operations import analyze, sha256_hash, get_current_time
 from typing import Annotated
-from sqlmodel import Field, Session, SQLModel, create_engine, select
-from datetime import datetime, timezone
-from sqlalchemy import Column, JSON
-from utilities.models import StringRequest, filterRequest
-from utilities.natural_language_parser import parse_natural_language_query
-import os
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, SQLModel, delete, select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+from datetime import timezone
+from utilities.models import TABLES, Hero, HeroCharacter, hero_hex, hero_key, hero_row, StringRequest, BatchStringRequest, filterRequest, pageRequest
+from utilities.queries import apply_filters, apply_keyset, encode_cursor
+from utilities.bulk import bulk_create_strings, MAX_BATCH_SIZE
+from utilities.natural_language_parser import plan_natural_language_query
+from utilities.cache import cached_json, invalidate_results
+from utilities.characters import character_rows
+from utilities.group_commit import GROUP_COMMIT, group_committer
+from utilities.membership import membership_filter
+from utilities.database import database_url, engine, get_session, insert_or_ignore, stream_scalars
+import json
 from dotenv import load_dotenv
 
 
@@ -16,51 +27,60 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+# Database engines and sessions are configured in utilities/database.py from DATABASE_URL.
+# With an async driver (sqlite+aiosqlite://, postgresql+asyncpg://) handlers get an AsyncSession,
+# otherwise a ThreadedSession that runs the sync Session in the threadpool.
+def create_db_and_tables():
+    # only the tables of the chosen STRING_SCHEMA
+    SQLModel.metadata.create_all(engine, tables=TABLES)
+    # create_all skips tables that already exist, so add any index introduced since
+    for table in TABLES:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
 
-class Hero(SQLModel, table=True):
-    id: str = Field(primary_key=True)
-    value: str = Field(index=True)
-    length: int = Field(index=True)
-    is_palindrome: bool = Field(index=True)
-    unique_characters: int = Field(index=True)
-    word_count: int = Field(index=True)
-    sha256_hash: str = Field(index=True)
-    character_frequency_map: dict | None = Field(default=None, sa_column=Column(JSON))
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-
-
-# Configure Database Connection
-# - Get URL from environment variable (for deploying on PostgreSQL)
-# - Fallback to SQLite (to easily run locally)
-database_url = os.getenv(
-    "DATABASE_URL", 
-    "sqlite:///database.db" # Default SQLite connection
-)
 
+SessionDep = Annotated[AsyncSession, Depends(get_session)]
 
-connect_args = {"check_same_thread": False} if "sqlite" in database_url else {}
-engine = create_engine(database_url, connect_args=connect_args)
 
-def create_db_and_tables():
-    SQLModel.metadata.create_all(engine)
 
-
-def get_session():
+def build_membership_filter():
     with Session(engine) as session:
-        yield session
-
-SessionDep = Annotated[Session, Depends(get_session)]
-
+        membership_filter.build(session)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     create_db_and_tables()
+    # built in the background; lookups go to the database until it is ready
+    build = asyncio.create_task(run_in_threadpool(build_membership_filter))
     yield
+    await build
 
 
 app = FastAPI(lifespan=lifespan)
 
+
+def format_hero(hero: Hero) -> dict:
+    """
+        Formats a stored string the way every endpoint returns it.
+    """
+    # the digest is stored as hex or as raw bytes depending on STRING_SCHEMA
+    string_item_hash = hero_hex(hero.id)
+    return {
+        "id": string_item_hash,
+        "value": hero.value,
+        "properties": {
+            "length": hero.length,
+            "is_palindrome": hero.is_palindrome,
+            "unique_characters": hero.unique_characters,
+            "word_count": hero.word_count,
+            "sha256_hash": string_item_hash,
+            "character_frequency_map": hero.character_frequency_map,
+        },
+        # modify created_at to match specific format.
+        "created_at": hero.created_at.replace(tzinfo=timezone.utc).isoformat().replace('+00:00', 'Z')
+    }
+
 # create string (POST)
 @app.post("/strings")
 async def create_string(request: StringRequest, session: SessionDep):
@@ -79,70 +99,88 @@ async def create_string(request: StringRequest, session: SessionDep):
     
     #check if string is empty
     value = value.strip()
-    print(value)
     if not value:
         raise HTTPException(status_code=400, detail='Invalid request body or missing "value" field')
 
-    #check if string in system
+    # compute every property in one analysis
     string_item_hash = sha256_hash(value)
-    existing_item = session.exec(select(Hero).where(Hero.sha256_hash == string_item_hash)).first()
-    if existing_item:
-        raise HTTPException(status_code=409, detail='String already exists in the system')
-   
-    properties = {
-        "length": length(value),
-        "is_palindrome": is_palindrome(value),
-        "unique_characters": unique_characters(value),
-        "word_count": word_count(value),
-        "sha256_hash": string_item_hash,
-        "character_frequency_map": character_frequency_map(value)
-    }
+    properties = analyze(value, string_item_hash).properties()
 
     # store current time as datetime object for easier manipulation later on
-    hero = Hero(
-        id = string_item_hash,
-        value = value,
-        length = properties["length"],
-        is_palindrome = properties["is_palindrome"],
-        unique_characters = properties["unique_characters"] ,
-        word_count = properties["word_count"],
-        sha256_hash = properties["sha256_hash"],
-        character_frequency_map = properties["character_frequency_map"],
-        created_at=get_current_time(),
+    row = hero_row(string_item_hash, value, properties, get_current_time())
+
+    char_rows = character_rows(row["id"], properties["character_frequency_map"])
+
+    # group commit: stored together with concurrent creates, answered after that commit
+    if GROUP_COMMIT:
+        if not await group_committer.create(row, char_rows):
+            raise HTTPException(status_code=409, detail='String already exists in the system')
+        return JSONResponse(content = format_hero(Hero(**row)), status_code = status.HTTP_201_CREATED)
+
+    # insert-or-conflict in one statement: no row back means the string is already stored,
+    # which stays correct when parallel requests store the same string
+    statement = insert_or_ignore(Hero.__table__).values(**row).returning(Hero.__table__.c.id)
+    try:
+        inserted = (await session.exec(statement)).first()
+    except IntegrityError:
+        inserted = None
+    if inserted is None:
+        await session.rollback()
+        raise HTTPException(status_code=409, detail='String already exists in the system')
+
+    # index the distinct characters for contains_character filters
+    await session.exec(insert(HeroCharacter.__table__), params=char_rows)
+    await session.commit()
+    invalidate_results()
+    membership_filter.add(row["id"])
+
+    # every value is already known, so no refresh
+    return JSONResponse(
+        content = format_hero(Hero(**row)),
+        status_code = status.HTTP_201_CREATED
     )
 
-    session.add(hero)   
-    session.commit()
-    session.refresh(hero)
-    
+
+# create many strings at once (POST)
+@app.post("/strings/batch")
+async def create_strings_batch(request: BatchStringRequest, session: SessionDep):
+    """
+        Recieves a list of input strings.
+        Checks duplicates with a single IN query and stores new strings in one bulk insert and transaction.
+        Returns a per-item status: created / conflict / invalid.
+        Raises error:   if batch is empty or larger than MAX_BATCH_SIZE (400 Bad Request).
+    """
+    if not request.values:
+        raise HTTPException(status_code=400, detail='"values" must contain at least one string')
+    if len(request.values) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f'Batch cannot contain more than {MAX_BATCH_SIZE} values')
+
+    results = await session.run_sync(bulk_create_strings, request.values)
+    summary = {"created": 0, "conflict": 0, "invalid": 0}
+    for result in results:
+        summary[result["status"]] += 1
+
     return JSONResponse(
         content = {
-            "id": hero.sha256_hash,
-            "value": hero.value,
-            "properties": {
-                "length": hero.length,
-                "is_palindrome": hero.is_palindrome,
-                "unique_characters": hero.unique_characters,
-                "word_count": hero.word_count,
-                "sha256_hash": hero.sha256_hash,
-                "character_frequency_map": hero.character_frequency_map,
-            },
-            # modify created_at to match specific format.
-            "created_at": hero.created_at.replace(tzinfo=timezone.utc).isoformat().replace('+00:00', 'Z')
+            "data": results,
+            "count": len(results),
+            "summary": summary,
         },
-        status_code = status.HTTP_201_CREATED
+        status_code = status.HTTP_200_OK
     )
 
 
 # get all strings with filtering (GET)
 @app.get("/strings")
-async def get_string_by_filter(filter_requests: filterRequest = Depends(), session: Session = Depends(get_session)):
+async def get_string_by_filter(filter_requests: filterRequest = Depends(), page: pageRequest = Depends(), session: AsyncSession = Depends(get_session)):
 
     """
         Fetches result based on filters. 
+        Paginates with limit/cursor (keyset on created_at, id) and streams rows as NDJSON if stream=true.
         returns formatted result if success (response 200 OK)
         raises error :(400 Bad Request) if it has invalid parameter values or type.
                       (400 Bad Request) if min_length > max_length
+                      (400 Bad Request) if cursor is invalid
     """
     filters = {k: v for k, v in vars(filter_requests).items() if v is not None}
     
@@ -150,51 +188,63 @@ async def get_string_by_filter(filter_requests: filterRequest = Depends(), sessi
     if (filters.get("min_length") and filters.get("max_length") and (filters.get("min_length") > filters.get("max_length"))):
         raise HTTPException(status_code=400, detail='min_length cannot be greater than max_length')
 
-    query = select(Hero)
-    # list filters
-    if filters.get("is_palindrome") is not None:
-        query = query.where(Hero.is_palindrome == filters["is_palindrome"])
-    if filters.get("min_length") is not None:
-        query = query.where(Hero.length >= filters["min_length"])
-    if filters.get("max_length") is not None:
-        query = query.where(Hero.length <= filters["max_length"])
-    if filters.get("word_count") is not None:
-        query = query.where(Hero.word_count == filters["word_count"])
-    if filters.get("contains_character") is not None:
-        query = query.where(Hero.value.contains(filters["contains_character"]))
-   
-    filtered_strings = session.exec(query).all()
-    
-    formatted_filtered_strings = []
-    for hero in filtered_strings:
-        formatted_filtered_strings.append({
-            "id": hero.sha256_hash,
-            "value": hero.value,
-            "properties": {
-                "length": hero.length,
-                "is_palindrome": hero.is_palindrome,
-                "unique_characters": hero.unique_characters,
-                "word_count": hero.word_count,
-                "sha256_hash": hero.sha256_hash,
-                "character_frequency_map": hero.character_frequency_map,
-            },
-            # modify created_at to match specific format.
-            "created_at": hero.created_at.replace(tzinfo=timezone.utc).isoformat().replace('+00:00', 'Z')
-        })
+    query = apply_filters(select(Hero), filters)
+    paginated = page.limit is not None or page.cursor is not None
+    if paginated or page.stream:
+        # validates the cursor before a streamed response starts
+        page_query = apply_keyset(query, page.cursor, page.limit)
+    else:
+        page_query = query
+
+    if page.stream:
+        return StreamingResponse(stream_heroes(session, page_query, page.limit), media_type="application/x-ndjson")
+
+    # results are cached per filters (and page) until the next write
+    if not paginated:
+        async def compute_results():
+            filtered_strings = (await session.exec(page_query)).all()
+            return {
+                "data": [format_hero(hero) for hero in filtered_strings],
+                "count": len(filtered_strings),
+            }
 
-    return JSONResponse(
+        body = await cached_json({"filters": filters}, compute_results, extra={"filters_applied": filters})
+        return Response(content = body, media_type = "application/json", status_code = status.HTTP_200_OK)
+
+    async def compute_page():
+        filtered_strings = (await session.exec(page_query)).all()
+        has_next_page = page.limit is not None and len(filtered_strings) > page.limit
+        filtered_strings = filtered_strings[:page.limit]
         content = {
-            "data":formatted_filtered_strings,
-            "count": len(formatted_filtered_strings),
+            "data": [format_hero(hero) for hero in filtered_strings],
             "filters_applied": filters,
-        },
-        status_code = status.HTTP_200_OK
-    )
+            "next_cursor": encode_cursor(filtered_strings[-1]) if has_next_page else None,
+        }
+        # total count is a separate COUNT query, only run when asked for
+        if page.include_count:
+            content["count"] = (await session.exec(select(func.count()).select_from(query.subquery()))).one()
+        return content
+
+    page_params = {"filters": filters, "limit": page.limit, "cursor": page.cursor, "include_count": page.include_count}
+    body = await cached_json(page_params, compute_page)
+    return Response(content = body, media_type = "application/json", status_code = status.HTTP_200_OK)
+
+
+async def stream_heroes(session: AsyncSession, query, limit: int | None = None):
+    """
+        Yields matching strings as NDJSON lines while rows come off the database cursor.
+    """
+    sent = 0
+    async for hero in stream_scalars(session, query):
+        if limit is not None and sent >= limit:
+            break
+        sent += 1
+        yield json.dumps(format_hero(hero)) + "\n"
 
 
 # get all strings with filtering in natural language. (GET)
 @app.get("/strings/filter-by-natural-language")
-async def get_string_by_natural_lang_filter(query: str = Query(...), session: Session = Depends(get_session)):
+async def get_string_by_natural_lang_filter(query: str = Query(...), session: AsyncSession = Depends(get_session)):
     """
         Takes natural language input as query.
         Parses it into filtering parameters using parsing logic.
@@ -205,49 +255,29 @@ async def get_string_by_natural_lang_filter(query: str = Query(...), session: Se
     """
     # Preserve the original text for output
     original_query = query
-    filters = parse_natural_language_query(query)
-    
-    db_query = select(Hero)
-    if filters.get("is_palindrome") is not None:
-        db_query = db_query.where(Hero.is_palindrome == filters["is_palindrome"])
-    if filters.get("min_length") is not None:
-        db_query = db_query.where(Hero.length >= filters["min_length"])
-    if filters.get("max_length") is not None:
-        db_query = db_query.where(Hero.length <= filters["max_length"])
-    if filters.get("word_count") is not None:
-        db_query = db_query.where(Hero.word_count == filters["word_count"])
-    if filters.get("contains_character") is not None:
-        db_query = db_query.where(Hero.value.contains(filters["contains_character"]))
-
-    filtered_strings = session.exec(db_query).all()
-    
-    formatted_filtered_strings = []
-    for hero in filtered_strings:
-        formatted_filtered_strings.append({
-            "id": hero.sha256_hash,
-            "value": hero.value,
-            "properties": {
-                "length": hero.length,
-                "is_palindrome": hero.is_palindrome,
-                "unique_characters": hero.unique_characters,
-                "word_count": hero.word_count,
-                "sha256_hash": hero.sha256_hash,
-                "character_frequency_map": hero.character_frequency_map,
-            },
-            "created_at": hero.created_at.replace(tzinfo=timezone.utc).isoformat().replace('+00:00', 'Z')
-        })
-
-    return JSONResponse(
-        content={
-            "data": formatted_filtered_strings,
-            "count": len(formatted_filtered_strings),
+    # parsed filters and statement are cached per normalized query
+    plan = plan_natural_language_query(query)
+    filters = dict(plan.filters)
+
+    async def compute_results():
+        filtered_strings = (await session.exec(plan.statement)).all()
+        return {
+            "data": [format_hero(hero) for hero in filtered_strings],
+            "count": len(filtered_strings),
+        }
+
+    # shares cached results with GET /strings for the same filters
+    body = await cached_json(
+        {"filters": filters},
+        compute_results,
+        extra={
             "interpreted_query": {
                 "original": original_query,
                 "parsed_filters": filters
             }
         },
-        status_code=status.HTTP_200_OK
     )
+    return Response(content = body, media_type = "application/json", status_code = status.HTTP_200_OK)
 
 
 
@@ -258,28 +288,18 @@ async def get_specific_string(string_value: str, session: SessionDep):
         Returns string if in database - success response 200 OK
         Else - error response 404 Not Found
     """
-    #check if string in system
-    string_item_hash = sha256_hash(string_value)
-    existing_item = session.exec(select(Hero).where(Hero.sha256_hash == string_item_hash)).first()
+    #check if string in system (the membership filter answers most misses without a query)
+    key = hero_key(sha256_hash(string_value))
+    if membership_filter.definitely_missing(key):
+        raise HTTPException(status_code=404, detail='String does not exist in the system')
+    existing_item = (await session.exec(select(Hero).where(Hero.id == key))).first()
     if not existing_item:
+        membership_filter.record_false_positive()
         raise HTTPException(status_code=404, detail='String does not exist in the system')
    
 
     return JSONResponse(
-        content = {
-            "id": existing_item.sha256_hash,
-            "value": existing_item.value,
-            "properties": {
-                "length": existing_item.length,
-                "is_palindrome": existing_item.is_palindrome,
-                "unique_characters": existing_item.unique_characters,
-                "word_count": existing_item.word_count,
-                "sha256_hash": existing_item.sha256_hash,
-                "character_frequency_map": existing_item.character_frequency_map,
-            },
-            # modify created_at to match specific format.
-            "created_at": existing_item.created_at.replace(tzinfo=timezone.utc).isoformat().replace('+00:00', 'Z')
-        },
+        content = format_hero(existing_item),
         status_code = status.HTTP_200_OK
     )
 
@@ -292,14 +312,32 @@ async def delete_string(string_value: str, session: SessionDep):
         returns nothing - success response 204
         raises 404 Not Found - If string does not exist in the system
     """
-    #check if string in system
-    string_item_hash = sha256_hash(string_value)
-    existing_item = session.exec(select(Hero).where(Hero.sha256_hash == string_item_hash)).first()
+    #check if string in system (the membership filter answers most misses without a query)
+    key = hero_key(sha256_hash(string_value))
+    if membership_filter.definitely_missing(key):
+        raise HTTPException(status_code=404, detail='String does not exist in the system')
+    existing_item = (await session.exec(select(Hero).where(Hero.id == key))).first()
     if not existing_item:
+        membership_filter.record_false_positive()
         raise HTTPException(status_code=404, detail='String does not exist in the system')
     
-    session.delete(existing_item)
-    session.commit()
+    await session.exec(delete(HeroCharacter).where(HeroCharacter.hero_id == existing_item.id))
+    await session.delete(existing_item)
+    await session.commit()
+    invalidate_results()
+    membership_filter.remove(key)
 
     return JSONResponse(content={}, status_code=status.HTTP_204_NO_CONTENT)
 
+
+# service metrics (GET)
+@app.get("/metrics")
+async def get_metrics():
+    """
+        Returns membership filter statistics (size, memory, expected and observed false positive rate)
+        and group commit statistics.
+    """
+    return JSONResponse(
+        content = {"membership_filter": membership_filter.stats(), "group_commit": group_committer.stats()},
+        status_code = status.HTTP_200_OK
+    )
@@ -0,0 +1,96 @@
+"""
+Copies stored strings from the legacy schema (table hero, hex keys) into the compact
+schema (table hero_v2, 32-byte binary keys, see STRING_SCHEMA in utilities/models.py).
+
+Rows are copied in chunks of --chunk-size, one transaction per chunk, in key order,
+together with their character index rows. Rows already in hero_v2 are skipped, so an
+interrupted run can simply be restarted. The legacy tables are left untouched; once
+the copy is done, restart the app with STRING_SCHEMA=compact.
+
+Usage:
+    python migrate_schema.py --chunk-size 1000
+"""
+import argparse
+import json
+import sys
+import time
+from sqlalchemy import insert
+from sqlmodel import Session, SQLModel, select
+from utilities.characters import character_rows
+from utilities.database import engine
+from utilities.models import CompactHero, CompactHeroCharacter, LegacyHero
+
+COMPACT_TABLES = [CompactHero.__table__, CompactHeroCharacter.__table__]
+
+
+def create_compact_tables(bind):
+    SQLModel.metadata.create_all(bind, tables=COMPACT_TABLES)
+
+
+def migrate_to_compact(session: Session, chunk_size: int = 1000, on_progress=None) -> dict:
+    """
+    Copies legacy rows that are not in hero_v2 yet. on_progress(totals) is called after
+    every commit. Returns totals {"copied": ..., "skipped": ...}.
+    """
+    totals = {"copied": 0, "skipped": 0}
+    last_id = ""
+    while True:
+        heroes = session.exec(
+            select(LegacyHero).where(LegacyHero.id > last_id).order_by(LegacyHero.id).limit(chunk_size)
+        ).all()
+        if not heroes:
+            return totals
+        last_id = heroes[-1].id
+
+        keys = [bytes.fromhex(hero.id) for hero in heroes]
+        copied = set(session.exec(select(CompactHero.id).where(CompactHero.id.in_(keys))).all())
+
+        rows, char_rows = [], []
+        for key, hero in zip(keys, heroes):
+            if key in copied:
+                totals["skipped"] += 1
+                continue
+            rows.append({
+                "id": key,
+                "value": hero.value,
+                "length": hero.length,
+                "is_palindrome": hero.is_palindrome,
+                "unique_characters": hero.unique_characters,
+                "word_count": hero.word_count,
+                "character_frequency_map": hero.character_frequency_map,
+                "created_at": hero.created_at,
+            })
+            char_rows.extend(character_rows(key, set(hero.value)))
+
+        if rows:
+            session.execute(insert(CompactHero.__table__), rows)
+            session.execute(insert(CompactHeroCharacter.__table__), char_rows)
+        session.commit()
+        # the ORM objects of this chunk are not needed again
+        session.expunge_all()
+
+        totals["copied"] += len(rows)
+        if on_progress is not None:
+            on_progress(dict(totals))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Copy strings into the compact (binary key) schema")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="rows copied per transaction")
+    args = parser.parse_args()
+
+    started = time.monotonic()
+
+    def report(totals):
+        print(f"copied={totals['copied']} skipped={totals['skipped']} ({time.monotonic() - started:.1f}s)", file=sys.stderr)
+
+    create_compact_tables(engine)
+    with Session(engine) as session:
+        totals = migrate_to_compact(session, args.chunk_size, report)
+
+    print(json.dumps(totals))
+    print("done - restart the app with STRING_SCHEMA=compact", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -40,6 +40,14 @@ def test_create_string_conflict():
     assert response.status_code == 409  # already exists
 
 
+def test_create_string_parallel_duplicates():
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        responses = list(pool.map(lambda _: client.post("/strings", json={"value": "parallel writer"}), range(8)))
+    assert sorted(response.status_code for response in responses) == [201] + [409] * 7
+
+
 def test_get_specific_string():
     response = client.get("/strings/madam")
     assert response.status_code == 200
@@ -83,6 +91,24 @@ def test_filter_by_natural_language_contains_letter():
     assert filters.get("contains_character") == "m"
 
 # The following deletion tests will use "Racecar" and "madam"
+def test_natural_language_plan_is_cached_per_normalized_query():
+    from fastapi import HTTPException
+    from utilities.natural_language_parser import plan_natural_language_query
+
+    plan = plan_natural_language_query("All single word  PALINDROMIC strings")
+    assert plan.filters == {"is_palindrome": True, "word_count": 1}
+    assert plan_natural_language_query(" all single word palindromic strings ") is plan
+
+    # bad queries are cached and raise every time
+    for _ in range(2):
+        with pytest.raises(HTTPException) as error:
+            plan_natural_language_query("strings longer than 10 and shorter than 5")
+        assert error.value.status_code == 422
+
+    response = client.get("/strings/filter-by-natural-language?query=gibberish")
+    assert response.status_code == 400
+
+
 def test_delete_first_string():
     response = client.delete("/strings/madam")
     assert response.status_code == 204
@@ -100,4 +126,266 @@ def test_delete_non_existent_string():
 
 def test_get_deleted_string():
     response = client.get("/strings/madam")
-    assert response.status_code == 404
\ No newline at end of file
+    assert response.status_code == 404
+
+# Single-pass analysis must match the individual operations
+@pytest.mark.parametrize("value", ["", "a", "Racecar", "madam", "hello world", "A man a plan", "ΣaΣ", "İ", "straße  ssarts", "a\tb\nc"])
+def test_analyze_matches_individual_operations(value):
+    from utilities.operations import analyze, length, is_palindrome, unique_characters, word_count, sha256_hash, character_frequency_map
+
+    result = analyze(value)
+    assert result.length == length(value)
+    assert result.is_palindrome == (value.lower() == value.lower()[::-1]) == is_palindrome(value)
+    assert result.unique_characters == unique_characters(value)
+    assert result.word_count == word_count(value)
+    assert result.sha256_hash == sha256_hash(value)
+    assert result.character_frequency_map == character_frequency_map(value)
+
+
+def test_create_strings_batch():
+    payload = {"values": ["batch one", "batch two", "batch one", "  ", 42]}
+    response = client.post("/strings/batch", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["status"] for item in data["data"]] == ["created", "created", "conflict", "invalid", "invalid"]
+    assert data["summary"] == {"created": 2, "conflict": 1, "invalid": 2}
+
+    # values stored by an earlier batch are conflicts
+    response = client.post("/strings/batch", json={"values": ["batch two", "batch three"]})
+    assert [item["status"] for item in response.json()["data"]] == ["conflict", "created"]
+
+    response = client.get("/strings/batch two")
+    assert response.status_code == 200
+    assert response.json()["properties"]["word_count"] == 2
+
+
+def test_create_strings_batch_empty():
+    response = client.post("/strings/batch", json={"values": []})
+    assert response.status_code == 400
+
+
+def test_import_ndjson_in_chunks_and_resume():
+    from sqlmodel import Session
+    from main import engine
+    from import_strings import import_ndjson
+
+    lines = [b'"import one"\n', b'{"value": "import two"}\n', b'\n', b'not json\n', b'"import one"\n', b'"import three"\n']
+    progress = []
+    with Session(engine) as session:
+        totals = import_ndjson(lines[:4], session, chunk_size=1, on_progress=progress.append)
+        assert totals == {"line": 4, "created": 2, "conflict": 0, "invalid": 1}
+        assert [p["line"] for p in progress] == [1, 2, 4]
+
+        # resume from the last committed line
+        totals = import_ndjson(lines, session, chunk_size=2, start_line=totals["line"])
+        assert totals == {"line": 6, "created": 1, "conflict": 1, "invalid": 0}
+
+    assert client.get("/strings/import three").status_code == 200
+
+
+def test_contains_character_uses_character_index():
+    client.post("/strings", json={"value": "zig zag"})
+    client.post("/strings/batch", json={"values": ["quiz", "jazz band"]})
+
+    response = client.get("/strings?contains_character=z")
+    values = {item["value"] for item in response.json()["data"]}
+    assert {"zig zag", "quiz", "jazz band"} <= values
+    assert all("z" in value for value in values)
+
+    # longer substrings fall back to a scan
+    response = client.get("/strings?contains_character=zz")
+    assert {item["value"] for item in response.json()["data"]} == {"jazz band"}
+
+    client.delete("/strings/quiz")
+    response = client.get("/strings/filter-by-natural-language?query=strings containing the letter q")
+    assert "quiz" not in {item["value"] for item in response.json()["data"]}
+
+
+def test_backfill_character_index():
+    from sqlalchemy import insert
+    from sqlmodel import Session, select
+    from main import engine
+    from utilities.characters import backfill_character_index
+    from utilities.models import Hero, HeroCharacter, hero_key, hero_row
+    from utilities.operations import analyze, get_current_time
+
+    # a row stored before the character index existed
+    result = analyze("legacy xylophone")
+    with Session(engine) as session:
+        session.execute(insert(Hero), [hero_row(result.sha256_hash, "legacy xylophone", result.properties(), get_current_time())])
+        session.commit()
+        assert backfill_character_index(session, chunk_size=1) == 1
+        assert backfill_character_index(session) == 0
+        chars = session.exec(select(HeroCharacter.char).where(HeroCharacter.hero_id == hero_key(result.sha256_hash))).all()
+        assert set(chars) == set("legacy xylophone")
+
+    response = client.get("/strings?contains_character=x")
+    assert "legacy xylophone" in {item["value"] for item in response.json()["data"]}
+
+
+def test_filter_results_are_cached_until_next_write():
+    first = client.get("/strings?word_count=4")
+    assert client.get("/strings?word_count=4").content == first.content
+    assert first.json()["filters_applied"] == {"word_count": 4}
+
+    client.post("/strings", json={"value": "four words in here"})
+    data = client.get("/strings?word_count=4").json()
+    assert data["count"] == first.json()["count"] + 1
+
+    response = client.get("/strings/filter-by-natural-language?query=4 word strings")
+    assert response.json()["count"] == data["count"]
+    assert response.json()["interpreted_query"]["original"] == "4 word strings"
+
+    client.delete("/strings/four words in here")
+    assert client.get("/strings?word_count=4").content == first.content
+
+
+def test_result_cache_backends(tmp_path):
+    from utilities.cache import MemoryResultCache, SQLiteResultCache, cache_key
+
+    cache = MemoryResultCache(max_entries=2, max_bytes=10)
+    cache.set(cache_key(0, {"a": 1}), b"12345")
+    cache.set(cache_key(0, {"b": 1}), b"12345")
+    cache.get(cache_key(0, {"a": 1}))
+    cache.set(cache_key(0, {"c": 1}), b"1")
+    assert cache.get(cache_key(0, {"b": 1})) is None  # least recently used
+    assert cache.size <= 10 and len(cache.entries) == 2
+
+    # two workers sharing one cache file see each other's writes and invalidations
+    worker_one = SQLiteResultCache(str(tmp_path / "cache.db"))
+    worker_two = SQLiteResultCache(str(tmp_path / "cache.db"))
+    key = cache_key(worker_one.generation(), {"filters": {}})
+    worker_one.set(key, b"body")
+    assert worker_two.get(key) == b"body"
+    worker_two.bump_generation()
+    assert worker_one.generation() == 1
+    assert worker_one.get(key) is None
+    worker_one.set(key, b"stale")  # computed before the bump
+    assert worker_two.get(key) is None
+
+
+def test_migrate_to_compact_schema(tmp_path):
+    from sqlalchemy import insert
+    from sqlmodel import Session, SQLModel, select
+    from migrate_schema import create_compact_tables, migrate_to_compact
+    from utilities.database import make_engine
+    from utilities.models import CompactHero, CompactHeroCharacter, LegacyHero
+    from utilities.operations import analyze, get_current_time
+
+    engine = make_engine(f"sqlite:///{tmp_path / 'migrate.db'}")
+    SQLModel.metadata.create_all(engine, tables=[LegacyHero.__table__])
+    create_compact_tables(engine)
+
+    values = ["level", "hello world", "abc"]
+    with Session(engine) as session:
+        rows = [{"id": analyze(value).sha256_hash, "value": value, **analyze(value).properties(), "created_at": get_current_time()} for value in values]
+        session.execute(insert(LegacyHero), rows)
+        session.commit()
+
+        assert migrate_to_compact(session, chunk_size=2) == {"copied": 3, "skipped": 0}
+        assert migrate_to_compact(session) == {"copied": 0, "skipped": 3}
+
+        level = session.get(CompactHero, bytes.fromhex(analyze("level").sha256_hash))
+        assert level.value == "level" and level.is_palindrome
+        chars = session.exec(select(CompactHeroCharacter.char).where(CompactHeroCharacter.hero_id == level.id)).all()
+        assert set(chars) == {"l", "e", "v"}
+
+
+def test_cuckoo_filter():
+    import hashlib
+    from utilities.membership import CuckooFilter
+
+    digests = [hashlib.sha256(str(i).encode()).digest() for i in range(20000)]
+    cuckoo = CuckooFilter(capacity=10000)
+    for digest in digests[:10000]:
+        cuckoo.add(digest)
+    assert not cuckoo.overflowed
+    assert all(cuckoo.might_contain(digest) for digest in digests[:10000])
+    false_positives = sum(cuckoo.might_contain(digest) for digest in digests[10000:])
+    assert false_positives / 10000 < 0.002
+
+    cuckoo.remove(digests[0])
+    assert cuckoo.count == 9999
+    assert all(cuckoo.might_contain(digest) for digest in digests[1:10000])
+
+
+def test_membership_filter_answers_misses():
+    from main import build_membership_filter
+    from utilities.membership import membership_filter
+
+    build_membership_filter()
+    try:
+        assert client.get("/strings/never stored anywhere").status_code == 404
+        assert client.delete("/strings/never stored anywhere").status_code == 404
+        stats = client.get("/metrics").json()["membership_filter"]
+        assert stats["ready"] and stats["definite_misses"] >= 2
+        assert stats["memory_bytes"] > 0 and stats["expected_false_positive_rate"] < 0.001
+
+        # creates and deletes keep the filter current
+        client.post("/strings", json={"value": "filtered value"})
+        client.post("/strings/batch", json={"values": ["filtered batch value"]})
+        assert client.get("/strings/filtered value").status_code == 200
+        assert client.get("/strings/filtered batch value").status_code == 200
+        assert client.delete("/strings/filtered value").status_code == 204
+        assert client.get("/strings/filtered value").status_code == 404
+    finally:
+        # later tests write rows directly, behind the filter's back
+        membership_filter.ready = False
+        membership_filter.filter = None
+
+
+def test_get_strings_keyset_pagination():
+    client.post("/strings/batch", json={"values": [f"page item {i}" for i in range(5)]})
+    everything = client.get("/strings").json()
+    expected_ids = sorted(item["id"] for item in everything["data"])
+
+    seen_ids, cursor = [], None
+    while True:
+        params = {"limit": 2, "include_count": "true"}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/strings", params=params)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == everything["count"]
+        assert len(data["data"]) <= 2
+        seen_ids.extend(item["id"] for item in data["data"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert sorted(seen_ids) == expected_ids
+    assert len(seen_ids) == len(set(seen_ids))
+
+
+def test_get_strings_paginated_count_is_optional():
+    data = client.get("/strings?limit=1").json()
+    assert "count" not in data
+    assert "next_cursor" in data
+
+
+def test_get_strings_invalid_cursor():
+    response = client.get("/strings?limit=2&cursor=not-a-cursor")
+    assert response.status_code == 400
+
+
+def test_get_strings_stream():
+    import json
+
+    response = client.get("/strings?stream=true&word_count=3")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert rows and all(row["properties"]["word_count"] == 3 for row in rows)
+
+    response = client.get("/strings?stream=true&limit=2")
+    assert len(response.text.splitlines()) == 2
+
+
+def test_async_database_urls_map_to_sync_drivers():
+    from utilities.database import is_async_url, to_sync_url
+
+    assert is_async_url("sqlite+aiosqlite:///database.db")
+    assert not is_async_url("sqlite:///database.db")
+    assert to_sync_url("sqlite+aiosqlite:///database.db") == "sqlite:///database.db"
+    assert to_sync_url("postgresql+asyncpg://user:pw@host/db") == "postgresql+psycopg2://user:pw@host/db"
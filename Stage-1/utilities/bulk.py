@@ -0,0 +1,89 @@
+import os
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+from utilities.cache import invalidate_results
+from utilities.characters import character_rows
+from utilities.membership import membership_filter
+from utilities.models import Hero, HeroCharacter, hero_hex, hero_key, hero_row
+from utilities.operations import analyze, sha256_hash, get_current_time
+
+# Maximum number of values accepted by POST /strings/batch
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", 10000))
+
+# Keep IN (...) lists below SQLite's bound parameter limit
+IN_QUERY_CHUNK_SIZE = 500
+
+
+def existing_hashes(session: Session, hashes: list[str]) -> set[str]:
+    """
+    Returns the subset of hashes already stored, using one IN query per chunk.
+    """
+    found = set()
+    for start in range(0, len(hashes), IN_QUERY_CHUNK_SIZE):
+        chunk = [hero_key(string_item_hash) for string_item_hash in hashes[start:start + IN_QUERY_CHUNK_SIZE]]
+        found.update(hero_hex(key) for key in session.exec(select(Hero.id).where(Hero.id.in_(chunk))).all())
+    return found
+
+
+def bulk_create_strings(session: Session, values: list) -> list[dict]:
+    """
+    Analyzes values and stores the new ones in a single bulk insert and transaction.
+    Returns one result per value, in order, with status:
+        created  - analyzed and stored
+        conflict - already in the database (or repeated earlier in the batch)
+        invalid  - not a string, or empty after stripping
+    """
+    results = []
+    candidates = {}  # hash -> (index of result, stripped value)
+
+    for value in values:
+        if not isinstance(value, str) or not value.strip():
+            results.append({"value": value, "status": "invalid", "detail": 'Invalid or missing "value"'})
+            continue
+
+        value = value.strip()
+        string_item_hash = sha256_hash(value)
+        if string_item_hash in candidates:
+            results.append({"value": value, "status": "conflict", "id": string_item_hash})
+            continue
+
+        candidates[string_item_hash] = (len(results), value)
+        results.append({"value": value, "status": "created", "id": string_item_hash})
+
+    if not candidates:
+        return results
+
+    for attempt in range(2):
+        # mark values that are already stored as conflicts
+        for string_item_hash in existing_hashes(session, list(candidates)):
+            index, _ = candidates.pop(string_item_hash)
+            results[index]["status"] = "conflict"
+
+        if not candidates:
+            return results
+
+        created_at = get_current_time()
+        rows = []
+        char_rows = []
+        for string_item_hash, (_, value) in candidates.items():
+            properties = analyze(value, string_item_hash).properties()
+            rows.append(hero_row(string_item_hash, value, properties, created_at))
+            char_rows.extend(character_rows(hero_key(string_item_hash), properties["character_frequency_map"]))
+
+        try:
+            # Core inserts of the table: rows are plain dicts, so skip the ORM bulk bookkeeping
+            session.execute(insert(Hero.__table__), rows)
+            session.execute(insert(HeroCharacter.__table__), char_rows)
+            session.commit()
+            invalidate_results()
+            for row in rows:
+                membership_filter.add(row["id"])
+            return results
+        except IntegrityError:
+            # a concurrent writer stored one of the values after the IN check; check again once
+            session.rollback()
+            if attempt:
+                raise
+
+    return results
@@ -0,0 +1,206 @@
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+# Result cache for filter queries
+# - RESULT_CACHE: memory (per process, default), sqlite (shared by workers on one host),
+#   redis (shared across hosts, needs the redis package) or off
+# - Entries are keyed by the canonical filters and a generation number that every write bumps,
+#   so a write invalidates every cached result at once
+RESULT_CACHE = os.getenv("RESULT_CACHE", "memory")
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", 512))
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+RESULT_CACHE_PATH = os.getenv("RESULT_CACHE_PATH", "result_cache.db")
+RESULT_CACHE_URL = os.getenv("RESULT_CACHE_URL", "redis://localhost:6379/0")
+RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", 300))
+
+
+def cache_key(generation: int, params: dict) -> str:
+    """
+    Returns the cache key for params (filters plus any paging parameters) at generation.
+    """
+    return f"{generation}:{json.dumps(params, sort_keys=True, separators=(',', ':'))}"
+
+
+class NullResultCache:
+    """
+    Caches nothing (RESULT_CACHE=off).
+    """
+
+    def generation(self) -> int:
+        return 0
+
+    def bump_generation(self):
+        pass
+
+    def get(self, key: str) -> bytes | None:
+        return None
+
+    def set(self, key: str, value: bytes):
+        pass
+
+
+class MemoryResultCache:
+    """
+    In-process LRU bounded by entry count and total bytes.
+    Only sees writes made by this process.
+    """
+
+    def __init__(self, max_entries: int = RESULT_CACHE_MAX_ENTRIES, max_bytes: int = RESULT_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self._generation = 0
+        # bulk writes bump the generation from threadpool workers
+        self.lock = threading.Lock()
+
+    def generation(self) -> int:
+        return self._generation
+
+    def bump_generation(self):
+        with self.lock:
+            self._generation += 1
+            # entries of older generations can never be read again
+            self.entries.clear()
+            self.size = 0
+
+    def get(self, key: str) -> bytes | None:
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes):
+        if len(value) > self.max_bytes:
+            return
+        with self.lock:
+            if not key.startswith(f"{self._generation}:"):
+                return  # computed before a write that finished in the meantime
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self.entries[key] = value
+            self.size += len(value)
+            while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+
+class SQLiteResultCache:
+    """
+    Cache shared by every worker process on one host, stored in a SQLite file.
+    Local stand-in for a shared cache server; evicts the oldest entries beyond max_entries.
+    """
+
+    def __init__(self, path: str = RESULT_CACHE_PATH, max_entries: int = RESULT_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS cache_generation (id INTEGER PRIMARY KEY CHECK (id = 0), generation INTEGER NOT NULL)")
+            self.connection.execute("INSERT OR IGNORE INTO cache_generation VALUES (0, 0)")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS cache_entry (key TEXT PRIMARY KEY, value BLOB NOT NULL)")
+
+    def generation(self) -> int:
+        with self.lock:
+            return self.connection.execute("SELECT generation FROM cache_generation").fetchone()[0]
+
+    def bump_generation(self):
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            self.connection.execute("UPDATE cache_generation SET generation = generation + 1")
+            self.connection.execute("DELETE FROM cache_entry")
+            self.connection.execute("COMMIT")
+
+    def get(self, key: str) -> bytes | None:
+        with self.lock:
+            row = self.connection.execute("SELECT value FROM cache_entry WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: bytes):
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            generation = self.connection.execute("SELECT generation FROM cache_generation").fetchone()[0]
+            if key.startswith(f"{generation}:"):
+                self.connection.execute("INSERT OR REPLACE INTO cache_entry (key, value) VALUES (?, ?)", (key, value))
+                self.connection.execute(
+                    "DELETE FROM cache_entry WHERE rowid <= (SELECT max(rowid) FROM cache_entry) - ?",
+                    (self.max_entries,),
+                )
+            self.connection.execute("COMMIT")
+
+
+class RedisResultCache:
+    """
+    Cache shared across hosts. Entries expire after ttl seconds, so entries of older
+    generations are dropped by Redis; size is bounded by the server's maxmemory policy.
+    """
+
+    def __init__(self, url: str = RESULT_CACHE_URL, ttl: int = RESULT_CACHE_TTL, prefix: str = "strings:"):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("RESULT_CACHE=redis needs the redis package (pip install redis)")
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def generation(self) -> int:
+        return int(self.client.get(f"{self.prefix}generation") or 0)
+
+    def bump_generation(self):
+        self.client.incr(f"{self.prefix}generation")
+
+    def get(self, key: str) -> bytes | None:
+        return self.client.get(f"{self.prefix}{key}")
+
+    def set(self, key: str, value: bytes):
+        self.client.set(f"{self.prefix}{key}", value, ex=self.ttl)
+
+
+def make_result_cache(backend: str = RESULT_CACHE):
+    if backend == "memory":
+        return MemoryResultCache()
+    if backend == "sqlite":
+        return SQLiteResultCache()
+    if backend == "redis":
+        return RedisResultCache()
+    if backend == "off":
+        return NullResultCache()
+    raise ValueError(f"Unknown RESULT_CACHE backend: {backend}")
+
+
+result_cache = make_result_cache()
+
+
+def invalidate_results():
+    """
+    Called after every committed write to the strings table.
+    """
+    result_cache.bump_generation()
+
+
+async def cached_json(params: dict, compute, extra: dict | None = None) -> bytes:
+    """
+    Returns a JSON object body whose leading members come from the cache entry for params,
+    or from await compute() on a miss, followed by the members of extra (never cached, e.g. the
+    original query text). Serialized like JSONResponse.
+    """
+    key = cache_key(result_cache.generation(), params)
+    body = result_cache.get(key)
+    if body is None:
+        body = render_members(await compute())
+        result_cache.set(key, body)
+    if extra:
+        body = body + b"," + render_members(extra)
+    return b"{" + body + b"}"
+
+
+def render_members(content: dict) -> bytes:
+    # an object's members without the surrounding braces
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")[1:-1]
@@ -0,0 +1,52 @@
+from sqlalchemy import insert
+from sqlmodel import Session, exists, select
+from utilities.cache import invalidate_results
+from utilities.models import Hero, HeroCharacter
+
+
+def character_rows(hero_id, characters) -> list[dict]:
+    """
+    Returns the character index rows for one string, given its distinct characters
+    (the keys of its character_frequency_map).
+    """
+    return [{"char": char, "hero_id": hero_id} for char in characters]
+
+
+def contains_character(character: str):
+    """
+    Returns a WHERE clause matching strings that contain character.
+    Single characters are looked up in the character index; longer substrings still scan.
+    """
+    if len(character) == 1:
+        return Hero.id.in_(select(HeroCharacter.hero_id).where(HeroCharacter.char == character))
+    return Hero.value.contains(character)
+
+
+def backfill_character_index(session: Session, chunk_size: int = 1000, on_progress=None) -> int:
+    """
+    Indexes the characters of every stored string that has no character index rows yet,
+    chunk_size strings per transaction. Safe to re-run; returns the number of strings indexed.
+    on_progress(indexed) is called after every commit.
+    """
+    indexed = 0
+    last_id = None
+    not_indexed = ~exists().where(HeroCharacter.hero_id == Hero.id)
+    while True:
+        query = select(Hero.id, Hero.value).where(not_indexed)
+        if last_id is not None:
+            query = query.where(Hero.id > last_id)
+        heroes = session.exec(query.order_by(Hero.id).limit(chunk_size)).all()
+        if not heroes:
+            return indexed
+
+        rows = []
+        for hero_id, value in heroes:
+            rows.extend(character_rows(hero_id, set(value)))
+        session.execute(insert(HeroCharacter.__table__), rows)
+        session.commit()
+        invalidate_results()
+
+        indexed += len(heroes)
+        last_id = heroes[-1][0]
+        if on_progress is not None:
+            on_progress(indexed)
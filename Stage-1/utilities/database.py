@@ -0,0 +1,180 @@
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+import asyncio
+import os
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+
+# Configure Database Connection
+# - Get URL from environment variable (for deploying on PostgreSQL)
+# - Fallback to SQLite (to easily run locally)
+# - An async driver in the URL (sqlite+aiosqlite://, postgresql+asyncpg://) switches
+#   request handlers to a non-blocking AsyncSession
+database_url = os.getenv(
+    "DATABASE_URL",
+    "sqlite:///database.db" # Default SQLite connection
+)
+
+# Connection pool per engine; request sessions are capped at pool_size + max_overflow
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+
+# async driver -> sync driver used for table creation, CLI tools and streaming
+ASYNC_DRIVERS = {
+    "sqlite+aiosqlite": "sqlite",
+    "postgresql+asyncpg": "postgresql+psycopg2",
+}
+
+
+def is_async_url(url: str) -> bool:
+    return make_url(url).drivername in ASYNC_DRIVERS
+
+
+def to_sync_url(url: str) -> str:
+    """
+    Returns url with its async driver swapped for the matching sync one.
+    """
+    parsed = make_url(url)
+    if parsed.drivername in ASYNC_DRIVERS:
+        parsed = parsed.set(drivername=ASYNC_DRIVERS[parsed.drivername])
+    return parsed.render_as_string(hide_password=False)
+
+
+def make_engine(url: str):
+    connect_args = {"check_same_thread": False} if make_url(url).get_backend_name() == "sqlite" else {}
+    return create_engine(url, connect_args=connect_args, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW)
+
+
+def make_async_engine(url: str):
+    # needs the async driver (aiosqlite / asyncpg) installed
+    return create_async_engine(url, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW)
+
+
+# the sync engine always exists; the async one only for async URLs
+engine = make_engine(to_sync_url(database_url))
+async_engine = make_async_engine(database_url) if is_async_url(database_url) else None
+
+
+def insert_or_ignore(table):
+    """
+    Returns INSERT ... ON CONFLICT DO NOTHING for table on SQLite and PostgreSQL.
+    Other databases get a plain INSERT, which raises IntegrityError on a duplicate key.
+    """
+    dialect_insert = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}.get(engine.dialect.name)
+    if dialect_insert is None:
+        return insert(table)
+    return dialect_insert(table).on_conflict_do_nothing()
+
+
+class ThreadedSession:
+    """
+    Async interface over a sync Session for sync database drivers.
+    Every call that talks to the database runs in the threadpool so it does not block the
+    event loop, and mirrors the AsyncSession API so handlers are written once for both.
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def add_all(self, instances):
+        self.sync_session.add_all(instances)
+
+    async def exec(self, statement, **kwargs):
+        # rows are buffered in the worker thread, like AsyncSession does
+        kwargs.setdefault("execution_options", {"prebuffer_rows": True})
+        return await run_in_threadpool(self.sync_session.exec, statement, **kwargs)
+
+    async def execute(self, statement, *args, **kwargs):
+        kwargs.setdefault("execution_options", {"prebuffer_rows": True})
+        return await run_in_threadpool(self.sync_session.execute, statement, *args, **kwargs)
+
+    async def scalar(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalar, statement, *args, **kwargs)
+
+    async def get(self, entity, ident, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kwargs)
+
+    async def delete(self, instance):
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def refresh(self, instance):
+        await run_in_threadpool(self.sync_session.refresh, instance)
+
+    async def flush(self):
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def commit(self):
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self):
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def close(self):
+        await run_in_threadpool(self.sync_session.close)
+
+    async def stream_scalars(self, statement, **kwargs):
+        """
+        Returns an async iterator over the rows of statement, like AsyncSession.stream_scalars.
+        """
+        result = await run_in_threadpool(self.sync_session.scalars, statement, **kwargs)
+        return self._iterate_partitions(result)
+
+    @staticmethod
+    async def _iterate_partitions(result):
+        # one threadpool hop per yield_per partition rather than per row
+        async for partition in iterate_in_threadpool(result.partitions()):
+            for row in partition:
+                yield row
+
+    async def run_sync(self, fn, *args, **kwargs):
+        """
+        Calls fn(sync_session, *args, **kwargs), like AsyncSession.run_sync.
+        """
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+
+def new_session():
+    """
+    Returns a session for request handlers: an AsyncSession for async drivers,
+    otherwise a ThreadedSession wrapping a sync Session.
+    """
+    if async_engine is not None:
+        return AsyncSession(async_engine, expire_on_commit=False)
+    return ThreadedSession(Session(engine, expire_on_commit=False))
+
+
+# Sessions wait here, on the event loop, for a free connection. Without it every threadpool
+# worker can end up blocked on a pool checkout while the requests holding connections wait
+# for a worker to commit and close, and the server stalls until the pool times out.
+session_slots = asyncio.Semaphore(DB_POOL_SIZE + DB_MAX_OVERFLOW)
+
+
+async def get_session():
+    async with session_slots:
+        session = new_session()
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+async def stream_scalars(session, query, yield_per: int = 500):
+    """
+    Yields ORM objects for query as they come off the database cursor, without
+    buffering the whole result. session is the request's session, which stays open
+    until a streamed response has been sent.
+    """
+    result = await session.stream_scalars(query.execution_options(yield_per=yield_per))
+    async for row in result:
+        yield row
@@ -0,0 +1,124 @@
+import asyncio
+import os
+from sqlalchemy import insert
+from sqlmodel import Session
+from utilities.cache import invalidate_results
+from utilities.database import insert_or_ignore, new_session, session_slots
+from utilities.membership import membership_filter
+from utilities.models import Hero, HeroCharacter
+
+# Group commit for POST /strings (opt-in, SQLite and PostgreSQL)
+# - creates arriving within GROUP_COMMIT_WINDOW_MS of each other (up to GROUP_COMMIT_MAX_ITEMS)
+#   are stored in one transaction, so one commit (fsync) is shared by the whole group
+# - every request still gets its response only after that commit
+GROUP_COMMIT = os.getenv("GROUP_COMMIT", "off") == "on"
+GROUP_COMMIT_WINDOW_MS = float(os.getenv("GROUP_COMMIT_WINDOW_MS", 5))
+GROUP_COMMIT_MAX_ITEMS = int(os.getenv("GROUP_COMMIT_MAX_ITEMS", 200))
+
+
+def store_group(session: Session, rows: list[dict], char_rows: list[dict]) -> set:
+    """
+    Inserts rows (skipping keys already stored) and the character rows of the inserted
+    ones in one transaction. Returns the keys that were inserted.
+    """
+    table = Hero.__table__
+    inserted = set(session.execute(insert_or_ignore(table).returning(table.c.id), rows).scalars())
+    char_rows = [char_row for char_row in char_rows if char_row["hero_id"] in inserted]
+    if char_rows:
+        session.execute(insert(HeroCharacter.__table__), char_rows)
+    session.commit()
+    return inserted
+
+
+class WriteGroup:
+    def __init__(self):
+        self.items = []  # (row, char_rows, future)
+        self.full = asyncio.Event()
+
+
+class GroupCommitter:
+    """
+    Collects creates from concurrent requests and commits them together.
+    The first create of a group schedules its commit; the others wait on its result.
+    """
+
+    def __init__(self, window_ms: float = GROUP_COMMIT_WINDOW_MS, max_items: int = GROUP_COMMIT_MAX_ITEMS):
+        self.window = window_ms / 1000
+        self.max_items = max_items
+        # one open group per event loop
+        self.groups = {}
+        # the event loop only keeps weak references to tasks
+        self.tasks = set()
+        self.commits = 0
+        self.items = 0
+        self.stored = 0
+
+    async def create(self, row: dict, char_rows: list[dict]) -> bool:
+        """
+        Stores row and its character rows with the next group commit.
+        Returns True once committed, or False if the string is already stored.
+        """
+        loop = asyncio.get_running_loop()
+        group = self.groups.get(loop)
+        if group is None:
+            group = self.groups[loop] = WriteGroup()
+            # a separate task, so a cancelled request does not take the group down with it
+            task = loop.create_task(self._commit_after_window(loop, group))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+        future = loop.create_future()
+        group.items.append((row, char_rows, future))
+        if len(group.items) >= self.max_items:
+            group.full.set()
+        return await future
+
+    async def _commit_after_window(self, loop, group: WriteGroup):
+        try:
+            await asyncio.wait_for(group.full.wait(), self.window)
+        except asyncio.TimeoutError:
+            pass
+        # new creates from here on start the next group
+        del self.groups[loop]
+
+        rows, char_rows, first_item = [], [], {}
+        for index, (row, item_char_rows, _) in enumerate(group.items):
+            if row["id"] not in first_item:
+                first_item[row["id"]] = index
+                rows.append(row)
+                char_rows.extend(item_char_rows)
+
+        try:
+            async with session_slots:
+                session = new_session()
+                try:
+                    inserted = await session.run_sync(store_group, rows, char_rows)
+                finally:
+                    await session.close()
+        except Exception as error:
+            for _, _, future in group.items:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        self.commits += 1
+        self.items += len(group.items)
+        self.stored += len(inserted)
+        invalidate_results()
+        for key in inserted:
+            membership_filter.add(key)
+        for index, (row, _, future) in enumerate(group.items):
+            if not future.done():
+                # a value repeated within the group is a conflict after its first occurrence
+                future.set_result(row["id"] in inserted and first_item[row["id"]] == index)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": GROUP_COMMIT,
+            "commits": self.commits,
+            "stored": self.stored,
+            "average_group_size": self.items / self.commits if self.commits else 0.0,
+        }
+
+
+group_committer = GroupCommitter()
@@ -0,0 +1,197 @@
+import os
+import random
+import threading
+from array import array
+from sqlmodel import Session, func, select
+from utilities.models import Hero
+
+# In-memory membership filter of stored strings, so lookups of strings that were never
+# stored get their 404 without a database query.
+# - The filter only sees writes made by this process (and the rows present when it was
+#   built). Turn it off when several workers serve the same database, or when
+#   import_strings.py runs next to the app, otherwise their new strings would 404 here.
+MEMBERSHIP_FILTER = os.getenv("MEMBERSHIP_FILTER", "on") == "on"
+MEMBERSHIP_FILTER_MIN_CAPACITY = int(os.getenv("MEMBERSHIP_FILTER_MIN_CAPACITY", 100000))
+
+BUCKET_SIZE = 4
+FINGERPRINT_BITS = 16
+MAX_KICKS = 500
+
+
+def _fingerprint_hash(fingerprint: int) -> int:
+    # spreads a fingerprint over the bucket index bits (alternate bucket = bucket ^ this)
+    return (fingerprint * 0x5BD1E995) & 0xFFFFFFFF
+
+
+class CuckooFilter:
+    """
+    Cuckoo filter over SHA-256 digests: 16-bit fingerprints in buckets of four.
+    The digest is already uniformly random, so the bucket index and fingerprint are taken
+    from its bytes instead of hashing again. Unlike a Bloom filter, items can be removed.
+    """
+
+    def __init__(self, capacity: int):
+        # power-of-two bucket count so the alternate bucket can be computed with xor
+        buckets = 1
+        while buckets * BUCKET_SIZE * 0.9 < capacity:
+            buckets *= 2
+        self.mask = buckets - 1
+        self.slots = array("H", bytes(2 * buckets * BUCKET_SIZE))
+        self.count = 0
+        self.overflowed = False  # an insert failed; negative answers are no longer reliable
+        self.lock = threading.Lock()
+        self.random = random.Random(0)
+
+    @property
+    def capacity(self) -> int:
+        return len(self.slots)
+
+    @property
+    def memory_bytes(self) -> int:
+        return self.slots.itemsize * len(self.slots)
+
+    def _locate(self, digest: bytes) -> tuple[int, int, int]:
+        fingerprint = int.from_bytes(digest[8:10], "big") or 1  # 0 marks an empty slot
+        first = int.from_bytes(digest[:8], "big") & self.mask
+        second = (first ^ _fingerprint_hash(fingerprint)) & self.mask
+        return fingerprint, first, second
+
+    def _bucket(self, index: int) -> range:
+        return range(index * BUCKET_SIZE, (index + 1) * BUCKET_SIZE)
+
+    def _place(self, fingerprint: int, index: int) -> bool:
+        for slot in self._bucket(index):
+            if self.slots[slot] == 0:
+                self.slots[slot] = fingerprint
+                return True
+        return False
+
+    def add(self, digest: bytes):
+        with self.lock:
+            fingerprint, first, second = self._locate(digest)
+            self.count += 1
+            if self._place(fingerprint, first) or self._place(fingerprint, second):
+                return
+
+            # both buckets full: evict fingerprints to their alternate bucket
+            index = self.random.choice((first, second))
+            for _ in range(MAX_KICKS):
+                slot = index * BUCKET_SIZE + self.random.randrange(BUCKET_SIZE)
+                fingerprint, self.slots[slot] = self.slots[slot], fingerprint
+                index = (index ^ _fingerprint_hash(fingerprint)) & self.mask
+                if self._place(fingerprint, index):
+                    return
+            self.overflowed = True
+
+    def remove(self, digest: bytes):
+        """
+        Removes one copy of digest. Only call it for digests that were added.
+        """
+        with self.lock:
+            fingerprint, first, second = self._locate(digest)
+            for index in (first, second):
+                for slot in self._bucket(index):
+                    if self.slots[slot] == fingerprint:
+                        self.slots[slot] = 0
+                        self.count -= 1
+                        return
+
+    def might_contain(self, digest: bytes) -> bool:
+        fingerprint, first, second = self._locate(digest)
+        slots = self.slots
+        return any(slots[slot] == fingerprint for slot in (*self._bucket(first), *self._bucket(second)))
+
+    def false_positive_rate(self) -> float:
+        """
+        Expected false positive rate at the current load: about
+        2 * bucket size * load / 2^fingerprint bits.
+        """
+        load = self.count / self.capacity
+        return 2 * BUCKET_SIZE * load / 2 ** FINGERPRINT_BITS
+
+
+class MembershipFilter:
+    """
+    The app's filter of stored strings, with hit/miss counters for GET /metrics.
+    Answers "definitely not stored" only once the startup build has finished.
+    """
+
+    def __init__(self, enabled: bool = MEMBERSHIP_FILTER):
+        self.enabled = enabled
+        self.ready = False
+        self.building = False
+        self.filter = None
+        self.lookups = 0
+        self.definite_misses = 0
+        self.false_positives = 0
+
+    def build(self, session: Session, min_capacity: int = MEMBERSHIP_FILTER_MIN_CAPACITY):
+        """
+        Loads every stored key. Writes made while this runs are applied too, except
+        removals, which only leave a harmless false positive.
+        """
+        if not self.enabled:
+            return
+        stored = session.exec(select(func.count()).select_from(Hero)).one()
+        self.building = True
+        self.filter = CuckooFilter(max(2 * stored, min_capacity))
+        for key in session.exec(select(Hero.id).execution_options(yield_per=10000)):
+            self.filter.add(digest_of(key))
+        self.building = False
+        self.ready = True
+
+    def usable(self) -> bool:
+        return self.ready and not self.filter.overflowed
+
+    def add(self, key):
+        if self.filter is not None:
+            self.filter.add(digest_of(key))
+
+    def remove(self, key):
+        # during the build the key may not have been loaded yet; removing it could drop another key
+        if self.filter is not None and not self.building:
+            self.filter.remove(digest_of(key))
+
+    def definitely_missing(self, key) -> bool:
+        """
+        True if key is certainly not stored, so the database does not need to be asked.
+        """
+        if not self.usable():
+            return False
+        self.lookups += 1
+        if self.filter.might_contain(digest_of(key)):
+            return False
+        self.definite_misses += 1
+        return True
+
+    def record_false_positive(self):
+        # the filter said "maybe" but the database did not have the key
+        if self.usable():
+            self.false_positives += 1
+
+    def stats(self) -> dict:
+        stats = {"enabled": self.enabled, "ready": self.ready}
+        if self.filter is None:
+            return stats
+        absent = self.definite_misses + self.false_positives
+        return {
+            **stats,
+            "overflowed": self.filter.overflowed,
+            "items": self.filter.count,
+            "capacity": self.filter.capacity,
+            "memory_bytes": self.filter.memory_bytes,
+            "expected_false_positive_rate": self.filter.false_positive_rate(),
+            "lookups": self.lookups,
+            "definite_misses": self.definite_misses,
+            "false_positives": self.false_positives,
+            # share of lookups for strings that are not stored which still went to the database
+            "observed_false_positive_rate": self.false_positives / absent if absent else 0.0,
+        }
+
+
+def digest_of(key) -> bytes:
+    # keys are raw digests in the compact schema and hex in the legacy one
+    return key if isinstance(key, bytes) else bytes.fromhex(key)
+
+
+membership_filter = MembershipFilter()
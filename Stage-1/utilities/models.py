@@ -1,10 +1,113 @@
-from fastapi import FastAPI
-from pydantic import BaseModel
+import os
+from typing import Any
+from pydantic import BaseModel, Field as PydanticField
+from sqlmodel import Field, SQLModel
+from sqlalchemy import Column, Index, JSON
+from datetime import datetime, timezone
+
+
+class Hero(SQLModel, table=True):
+    # keyset pagination orders by (created_at, id)
+    __table_args__ = (Index("ix_hero_created_at_id", "created_at", "id"),)
+
+    id: str = Field(primary_key=True)
+    value: str = Field(index=True)
+    length: int = Field(index=True)
+    is_palindrome: bool = Field(index=True)
+    unique_characters: int = Field(index=True)
+    word_count: int = Field(index=True)
+    sha256_hash: str = Field(index=True)
+    character_frequency_map: dict | None = Field(default=None, sa_column=Column(JSON))
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class HeroCharacter(SQLModel, table=True):
+    # one row per distinct character of a stored string, so contains_character is an index lookup
+    __tablename__ = "hero_character"
+    __table_args__ = (Index("ix_hero_character_hero_id", "hero_id"),)
+
+    char: str = Field(primary_key=True)
+    hero_id: str = Field(primary_key=True, foreign_key="hero.id", ondelete="CASCADE")
+
+
+class CompactHero(SQLModel, table=True):
+    # STRING_SCHEMA=compact: the 32-byte SHA-256 digest is the only key (hex only in API responses),
+    # and the indexes match the filter shapes instead of one index per column
+    __tablename__ = "hero_v2"
+    __table_args__ = (
+        Index("ix_hero_v2_created_at_id", "created_at", "id"),       # keyset pagination
+        Index("ix_hero_v2_word_count_length", "word_count", "length"),  # word_count, optionally with a length range
+        Index("ix_hero_v2_is_palindrome_length", "is_palindrome", "length"),  # palindromes, optionally with a length range
+        Index("ix_hero_v2_length", "length"),                         # length range alone
+        # on SQLite the table is stored in key order instead of next to a separate rowid B-tree
+        {"sqlite_with_rowid": False},
+    )
+
+    id: bytes = Field(primary_key=True)
+    value: str
+    length: int
+    is_palindrome: bool
+    unique_characters: int
+    word_count: int
+    character_frequency_map: dict | None = Field(default=None, sa_column=Column(JSON))
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class CompactHeroCharacter(SQLModel, table=True):
+    __tablename__ = "hero_character_v2"
+    __table_args__ = (Index("ix_hero_character_v2_hero_id", "hero_id"), {"sqlite_with_rowid": False})
+
+    char: str = Field(primary_key=True)
+    hero_id: bytes = Field(primary_key=True, foreign_key="hero_v2.id", ondelete="CASCADE")
+
+
+# Storage schema for strings: legacy (hex keys, table hero) or compact (binary keys, table hero_v2).
+# The rest of the app uses Hero / HeroCharacter, which point at the tables of the chosen schema.
+# Move existing rows with migrate_schema.py before switching.
+STRING_SCHEMA = os.getenv("STRING_SCHEMA", "legacy")
+if STRING_SCHEMA not in ("legacy", "compact"):
+    raise ValueError(f"Unknown STRING_SCHEMA: {STRING_SCHEMA}")
+
+LegacyHero, LegacyHeroCharacter = Hero, HeroCharacter
+if STRING_SCHEMA == "compact":
+    Hero, HeroCharacter = CompactHero, CompactHeroCharacter
+
+TABLES = [Hero.__table__, HeroCharacter.__table__]
+
+
+def hero_key(sha256_hex: str):
+    """
+    Returns the primary key of the string with this SHA-256 hex digest in the active schema.
+    """
+    return bytes.fromhex(sha256_hex) if Hero is CompactHero else sha256_hex
+
+
+def hero_hex(key) -> str:
+    """
+    Returns the SHA-256 hex digest for a primary key of either schema.
+    """
+    return key.hex() if isinstance(key, bytes) else key
+
+
+def hero_row(sha256_hex: str, value: str, properties: dict, created_at: datetime) -> dict:
+    """
+    Returns the column values of a new string in the active schema, from analyze(...).properties().
+    """
+    row = {"id": hero_key(sha256_hex), "value": value, **properties, "created_at": created_at}
+    if Hero is CompactHero:
+        del row["sha256_hash"]  # the key is the digest
+    return row
+
 
 class StringRequest(BaseModel):
     value: str
 
 
+class BatchStringRequest(BaseModel):
+    # items are validated one by one so a bad item does not reject the whole batch
+    values: list[Any]
+
+
 class filterRequest(BaseModel):
     is_palindrome: bool | None = None
     min_length: int | None = None
@@ -12,3 +115,10 @@ class filterRequest(BaseModel):
     word_count: int | None = None
     contains_character: str | None = None
 
+
+
+class pageRequest(BaseModel):
+    limit: int | None = PydanticField(default=None, ge=1, le=1000)
+    cursor: str | None = None
+    stream: bool = False
+    include_count: bool = False
@@ -1,51 +1,78 @@
+import os
 import re
+from dataclasses import dataclass
+from typing import Any
+from functools import lru_cache
 from fastapi import HTTPException
+from sqlmodel import select
+from utilities.models import Hero
+from utilities.queries import apply_filters
 
-def parse_natural_language_query(query: str) -> dict:
+# Number of distinct (normalized) queries whose plan is kept
+NL_QUERY_CACHE_SIZE = int(os.getenv("NL_QUERY_CACHE_SIZE", 1024))
+
+# Longer queries are parsed every time so a flood of unique queries cannot fill the cache with large keys
+MAX_CACHED_QUERY_LENGTH = 256
+
+# Grammar, compiled once
+PALINDROME_PATTERN = re.compile(r"\bpalindrom(ic|e)\b")
+WORD_COUNT_PATTERN = re.compile(r"(\b\d+\b|\bsingle\b|\btwo\b|\bthree\b)\s+word")
+LONGER_THAN_PATTERN = re.compile(r"longer than (\d+)")
+SHORTER_THAN_PATTERN = re.compile(r"shorter than (\d+)")
+EXACTLY_PATTERN = re.compile(r"exactly (\d+)")
+CONTAINS_LETTER_PATTERN = re.compile(r"contain(?:s|ing)?(?: the letter)? ([a-zA-Z])")
+WORD_COUNTS = {"single": 1, "one": 1, "two": 2, "three": 3}
+
+
+@dataclass(frozen=True, slots=True)
+class QueryPlan:
     """
-    Parses a natural language query into structured filters.
-    Supported patterns:
-        - "all single word palindromic strings"
-        - "strings longer than 10 characters"
-        - "palindromic strings that contain the first vowel"
-        - "strings containing the letter z"
+    Result of planning one query: the parsed filters and the select statement built
+    from them, or the (status_code, detail) of the error the query raises.
+    """
+    filters: dict
+    statement: Any = None
+    error: tuple[int, str] | None = None
+
+
+def normalize_query(query: str) -> str:
+    """
+    Lowercases query and collapses runs of whitespace, so equivalent phrasings share a plan.
     """
-    if not query or not query.strip():
-        raise HTTPException(status_code=400, detail="Query cannot be empty")
+    return " ".join(query.lower().split())
 
-    query = query.lower().strip()
+
+def _parse_normalized_query(query: str) -> dict:
     filters = {}
 
     # Match palindromic strings
-    if re.search(r"\bpalindrom(ic|e)\b", query):
+    if PALINDROME_PATTERN.search(query):
         filters["is_palindrome"] = True
 
     # Match "single word" or "two words"
-    word_count_match = re.search(r"(\b\d+\b|\bsingle\b|\btwo\b|\bthree\b)\s+word", query)
-    if word_count_match:
-        mapping = {"single": 1, "one": 1, "two": 2, "three": 3}
+    if word_count_match := WORD_COUNT_PATTERN.search(query):
         word_key = word_count_match.group(1)
-        if word_key in mapping:
-            filters["word_count"] = mapping[word_key]
+        if word_key in WORD_COUNTS:
+            filters["word_count"] = WORD_COUNTS[word_key]
         elif word_key.isdigit():
             filters["word_count"] = int(word_key)
 
     # Match "longer than X characters"
-    if match := re.search(r"longer than (\d+)", query):
+    if match := LONGER_THAN_PATTERN.search(query):
         filters["min_length"] = int(match.group(1)) + 1
 
     # Match "shorter than X characters"
-    if match := re.search(r"shorter than (\d+)", query):
+    if match := SHORTER_THAN_PATTERN.search(query):
         filters["max_length"] = int(match.group(1)) - 1
 
     # Match "exactly X characters"
-    if match := re.search(r"exactly (\d+)", query):
+    if match := EXACTLY_PATTERN.search(query):
         length = int(match.group(1))
         filters["min_length"] = length
         filters["max_length"] = length
 
     # Match "containing the letter X"
-    if match := re.search(r"contain(?:s|ing)?(?: the letter)? ([a-zA-Z])", query):
+    if match := CONTAINS_LETTER_PATTERN.search(query):
         filters["contains_character"] = match.group(1).lower()
 
     # Special case: "first vowel"
@@ -63,3 +90,50 @@ def parse_natural_language_query(query: str) -> dict:
         raise HTTPException(status_code=422, detail="Conflicting filters: min_length > max_length")
 
     return filters
+
+
+def _build_plan(normalized_query: str) -> QueryPlan:
+    if not normalized_query:
+        return QueryPlan({}, error=(400, "Query cannot be empty"))
+    try:
+        filters = _parse_normalized_query(normalized_query)
+    except HTTPException as error:
+        return QueryPlan({}, error=(error.status_code, error.detail))
+    # statements are immutable, so one instance can be shared by every request
+    return QueryPlan(filters, apply_filters(select(Hero), filters))
+
+
+_cached_plan = lru_cache(maxsize=NL_QUERY_CACHE_SIZE)(_build_plan)
+
+
+def plan_natural_language_query(query: str) -> QueryPlan:
+    """
+    Returns the plan for query, from the LRU cache when the normalized query was seen before.
+    Bad queries are cached too; raises their HTTPException on every call.
+    """
+    normalized_query = normalize_query(query or "")
+    if len(normalized_query) > MAX_CACHED_QUERY_LENGTH:
+        plan = _build_plan(normalized_query)
+    else:
+        plan = _cached_plan(normalized_query)
+
+    if plan.error is not None:
+        status_code, detail = plan.error
+        raise HTTPException(status_code=status_code, detail=detail)
+    return plan
+
+
+def plan_cache_info():
+    return _cached_plan.cache_info()
+
+
+def parse_natural_language_query(query: str) -> dict:
+    """
+    Parses a natural language query into structured filters.
+    Supported patterns:
+        - "all single word palindromic strings"
+        - "strings longer than 10 characters"
+        - "palindromic strings that contain the first vowel"
+        - "strings containing the letter z"
+    """
+    return dict(plan_natural_language_query(query).filters)
@@ -1,4 +1,5 @@
 from collections import Counter 
+from dataclasses import dataclass
 from datetime import datetime, timezone
 import hashlib
 
@@ -12,8 +13,22 @@ def is_palindrome(item: str):
     """
     Return true if words is reads backwards as same as forward (case sensitive)
     """
-    normalized_item = item.lower()
-    return normalized_item == normalized_item[::-1]
+    return _is_palindrome(item)
+
+def _is_palindrome(item: str):
+    """
+    Case-insensitive palindrome check that avoids full-size copies:
+    rejects on the outer characters first (when they are ASCII), skips .lower() when the string
+    is already lowercase, and compares the first half with the reversed second half.
+    """
+    if not item:
+        return True
+    first, last = item[0], item[-1]
+    if first.isascii() and last.isascii() and first.lower() != last.lower():
+        return False
+    normalized_item = item if item.islower() else item.lower()
+    half = len(normalized_item) // 2
+    return normalized_item[:half] == normalized_item[:-half - 1:-1]
 
 def unique_characters(item: str):
     '''
@@ -44,5 +59,44 @@ def character_frequency_map(item: str):
     """
     return dict(Counter(item))
 
+@dataclass(frozen=True, slots=True)
+class StringAnalysis:
+    """
+    All computed properties of a string.
+    """
+    length: int
+    is_palindrome: bool
+    unique_characters: int
+    word_count: int
+    sha256_hash: str
+    character_frequency_map: dict
+
+    def properties(self):
+        return {
+            "length": self.length,
+            "is_palindrome": self.is_palindrome,
+            "unique_characters": self.unique_characters,
+            "word_count": self.word_count,
+            "sha256_hash": self.sha256_hash,
+            "character_frequency_map": self.character_frequency_map,
+        }
+
+def analyze(item: str, item_hash: str | None = None):
+    """
+    Computes every property of item with as few passes over the string as possible.
+    The frequency map is built once and also gives the unique character count.
+    Pass item_hash if the SHA-256 hash was already computed.
+    """
+    frequency_map = dict(Counter(item))
+
+    return StringAnalysis(
+        length=len(item),
+        is_palindrome=_is_palindrome(item),
+        unique_characters=len(frequency_map),
+        word_count=len(item.split()),
+        sha256_hash=item_hash if item_hash is not None else sha256_hash(item),
+        character_frequency_map=frequency_map,
+    )
+
 def get_current_time():
     return datetime.now(timezone.utc)
\ No newline at end of file
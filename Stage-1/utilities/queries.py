@@ -0,0 +1,61 @@
+import base64
+import json
+from datetime import datetime
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+from utilities.characters import contains_character
+from utilities.models import Hero, hero_hex, hero_key
+
+
+def apply_filters(query, filters: dict):
+    """
+    Adds a WHERE clause to query for every filter that is set.
+    Shared by GET /strings and the natural language endpoint.
+    """
+    if filters.get("is_palindrome") is not None:
+        query = query.where(Hero.is_palindrome == filters["is_palindrome"])
+    if filters.get("min_length") is not None:
+        query = query.where(Hero.length >= filters["min_length"])
+    if filters.get("max_length") is not None:
+        query = query.where(Hero.length <= filters["max_length"])
+    if filters.get("word_count") is not None:
+        query = query.where(Hero.word_count == filters["word_count"])
+    if filters.get("contains_character") is not None:
+        query = query.where(contains_character(filters["contains_character"]))
+    return query
+
+
+def encode_cursor(hero: Hero) -> str:
+    """
+    Returns an opaque cursor pointing just after hero in (created_at, id) order.
+    """
+    created_at = hero.created_at.replace(tzinfo=None).isoformat()
+    raw = json.dumps([created_at, hero_hex(hero.id)], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str | bytes]:
+    """
+    Decodes a cursor from encode_cursor.
+    Raises 400 Bad Request if the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, hero_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), hero_key(str(hero_id))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def apply_keyset(query, cursor: str | None = None, limit: int | None = None):
+    """
+    Orders query by (created_at, id) and, if given, starts after cursor and fetches
+    limit + 1 rows (the extra row tells whether there is a next page).
+    """
+    if cursor is not None:
+        created_at, hero_id = decode_cursor(cursor)
+        query = query.where(tuple_(Hero.created_at, Hero.id) > tuple_(created_at, hero_id))
+    query = query.order_by(Hero.created_at, Hero.id)
+    if limit is not None:
+        query = query.limit(limit + 1)
+    return query